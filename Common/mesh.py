@@ -0,0 +1,130 @@
+import os
+import sys
+import numpy as np
+
+ICOSPHERE_MAX_LEVEL = 8
+CACHE_DIR = os.environ.get("MESH_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mesh_cache"))
+
+def uv_sphere(sectors, stacks, radius=1.0, up="z", flip_v=False):
+    theta = np.arange(stacks + 1) * (np.pi / stacks)
+    phi = np.arange(sectors + 1) * (2 * np.pi / sectors)
+    sin_theta = np.sin(theta).astype(np.float32)[:, None]
+    cos_theta = np.cos(theta).astype(np.float32)[:, None]
+    sin_phi = np.sin(phi).astype(np.float32)[None, :]
+    cos_phi = np.cos(phi).astype(np.float32)[None, :]
+    normals = np.empty((stacks + 1, sectors + 1, 3), dtype=np.float32)
+    if up == "z":
+        normals[..., 0] = sin_theta * cos_phi
+        normals[..., 1] = sin_theta * sin_phi
+        normals[..., 2] = cos_theta
+    elif up == "y":
+        normals[..., 0] = sin_theta * cos_phi
+        normals[..., 1] = cos_theta
+        normals[..., 2] = sin_theta * sin_phi
+    else:
+        raise ValueError(f"Неизвестная ось: {up}")
+    normals = normals.reshape(-1, 3)
+    positions = normals * np.float32(radius)
+    uvs = np.empty((stacks + 1, sectors + 1, 2), dtype=np.float32)
+    uvs[..., 0] = np.arange(sectors + 1)[None, :] / sectors
+    v = np.arange(stacks + 1)[:, None] / stacks
+    uvs[..., 1] = 1 - v if flip_v else v
+    indices = grid_indices(sectors, stacks)
+    if up == "y":
+        indices = indices.reshape(-1, 3)[:, [0, 2, 1]].ravel()
+    return positions, normals, uvs.reshape(-1, 2), indices
+
+def grid_corners(sectors, stacks, corners):
+    first = (np.arange(stacks, dtype=np.uint32)[:, None] * np.uint32(sectors + 1) +
+             np.arange(sectors, dtype=np.uint32)[None, :])
+    offsets = np.array([0, sectors + 1, sectors + 2, 1], dtype=np.uint32)[corners]
+    return (first[:, :, None] + offsets).reshape(-1, len(corners))
+
+def grid_quads(sectors, stacks):
+    return grid_corners(sectors, stacks, [0, 1, 2, 3])
+
+def grid_indices(sectors, stacks):
+    return grid_corners(sectors, stacks, [0, 1, 2, 0, 2, 3]).ravel()
+
+def interleave(*attributes):
+    data = np.empty((len(attributes[0]), sum(a.shape[1] for a in attributes)), dtype=np.float32)
+    column = 0
+    for a in attributes:
+        data[:, column:column + a.shape[1]] = a
+        column += a.shape[1]
+    return data
+
+def icosahedron():
+    t = (1 + 5 ** 0.5) / 2
+    positions = np.array([
+        (-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0),
+        (0, -1, t), (0, 1, t), (0, -1, -t), (0, 1, -t),
+        (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1)
+    ], dtype=np.float64)
+    faces = np.array([
+        (0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+        (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+        (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+        (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)
+    ], dtype=np.uint32)
+    return positions / np.linalg.norm(positions, axis=1, keepdims=True), faces
+
+def subdivide(positions, faces):
+    n = len(positions)
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1).astype(np.int64)
+    codes, inverse = np.unique(edges[:, 0] * n + edges[:, 1], return_inverse=True)
+    middle = positions[codes // n] + positions[codes % n]
+    middle /= np.linalg.norm(middle, axis=1, keepdims=True)
+    v0, v1, v2 = faces.T
+    m01, m12, m20 = (inverse.reshape(-1, 3) + n).astype(np.uint32).T
+    faces = np.stack((v0, m01, m20, v1, m12, m01, v2, m20, m12, m01, m12, m20), axis=1).reshape(-1, 3)
+    return np.concatenate((positions, middle)), faces
+
+def icosphere_level(level):
+    if not 0 <= level <= ICOSPHERE_MAX_LEVEL:
+        raise ValueError(f"Уровень икосферы вне диапазона 0..{ICOSPHERE_MAX_LEVEL}: {level}")
+    path = os.path.join(CACHE_DIR, f"icosphere_{level}.npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return data["positions"], data["faces"]
+    if level == 0:
+        positions, faces = icosahedron()
+    else:
+        positions, faces = subdivide(*icosphere_level(level - 1))
+    positions = positions.astype(np.float32)
+    partial = path + ".tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(partial, "wb") as f:
+            np.savez(f, positions=positions, faces=faces)
+        os.replace(partial, path)
+    except OSError as error:
+        print(f"Не удалось сохранить икосферу уровня {level}: {error}", file=sys.stderr)
+    return positions, faces
+
+def icosphere(level, radius=1.0, up="z", flip_v=False):
+    normals, faces = icosphere_level(level)
+    if up == "z":
+        azimuth = np.arctan2(normals[:, 1], normals[:, 0])
+        polar = np.arccos(np.clip(normals[:, 2], -1, 1))
+    elif up == "y":
+        normals = normals[:, [0, 2, 1]]
+        faces = faces[:, [0, 2, 1]]
+        azimuth = np.arctan2(normals[:, 2], normals[:, 0])
+        polar = np.arccos(np.clip(normals[:, 1], -1, 1))
+    else:
+        raise ValueError(f"Неизвестная ось: {up}")
+    uvs = np.empty((len(normals), 2), dtype=np.float32)
+    uvs[:, 0] = np.mod(azimuth, 2 * np.pi) / (2 * np.pi)
+    uvs[:, 1] = 1 - polar / np.pi if flip_v else polar / np.pi
+    faces = np.array(faces, dtype=np.uint32)
+    u = uvs[faces, 0]
+    seam = ((u.max(axis=1) - u.min(axis=1)) > 0.5)[:, None] & (u < 0.5)
+    copies, inverse = np.unique(faces[seam], return_inverse=True)
+    faces[seam] = len(normals) + inverse
+    normals = np.concatenate((normals, normals[copies])).astype(np.float32)
+    uvs = np.concatenate((uvs, uvs[copies] + np.float32([1, 0])))
+    return normals * np.float32(radius), normals, uvs, faces.ravel()
+
+if __name__ == "__main__":
+    icosphere_level(ICOSPHERE_MAX_LEVEL)
@@ -0,0 +1,66 @@
+import sys
+import threading
+
+class MeshBuilder:
+    def __init__(self, cache, prepare, upload):
+        self.cache = cache
+        self.prepare = prepare
+        self.upload = upload
+        self.wanted = None
+        self.pending = None
+        self.ready = None
+        self.error = None
+        self.closed = False
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def request(self, kind, sectors, stacks):
+        key = (kind, sectors, stacks)
+        self.wanted = key
+        mesh = self.cache.lookup(key)
+        with self.lock:
+            self.pending = None if mesh is not None else key
+            if mesh is None:
+                self.wakeup.set()
+        return mesh
+
+    def poll(self):
+        with self.lock:
+            ready, self.ready = self.ready, None
+            error, self.error = self.error, None
+        if error is not None and error[0] == self.wanted:
+            print(f"Не удалось построить сетку {error[0]}: {error[1]!r}", file=sys.stderr)
+        if ready is None or ready[0] != self.wanted:
+            return None
+        key, arrays = ready
+        mesh = self.cache.lookup(key)
+        if mesh is None:
+            mesh = self.cache.put(key, self.upload[key[0]](*arrays))
+        return mesh
+
+    def run(self):
+        while True:
+            self.wakeup.wait()
+            with self.lock:
+                key, self.pending = self.pending, None
+                self.wakeup.clear()
+            if self.closed:
+                return
+            if key is None:
+                continue
+            kind, sectors, stacks = key
+            try:
+                arrays = self.prepare[kind](sectors, stacks)
+            except Exception as error:
+                with self.lock:
+                    self.error = (key, error)
+                continue
+            with self.lock:
+                self.ready = (key, arrays)
+
+    def close(self):
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join()
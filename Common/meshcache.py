@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from OpenGL.GL import *
+
+class GpuMesh:
+    def __init__(self, buffers, count, nbytes, vao=None):
+        self.buffers = list(buffers)
+        self.count = count
+        self.nbytes = nbytes
+        self.vao = vao
+
+    def release(self):
+        if self.vao is not None:
+            glDeleteVertexArrays(1, [self.vao])
+        glDeleteBuffers(len(self.buffers), self.buffers)
+
+class MeshCache:
+    def __init__(self, builders, budget=64 << 20):
+        self.builders = builders
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.resident = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, sectors, stacks):
+        key = (kind, sectors, stacks)
+        mesh = self.lookup(key)
+        if mesh is None:
+            mesh = self.put(key, self.builders[kind](sectors, stacks))
+        return mesh
+
+    def lookup(self, key):
+        mesh = self.entries.get(key)
+        if mesh is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return mesh
+
+    def put(self, key, mesh):
+        self.misses += 1
+        self.entries[key] = mesh
+        self.resident += mesh.nbytes
+        self.evict()
+        return mesh
+
+    def evict(self):
+        while self.resident > self.budget and len(self.entries) > 1:
+            _, mesh = self.entries.popitem(last=False)
+            self.resident -= mesh.nbytes
+            mesh.release()
+
+    def clear(self):
+        for mesh in self.entries.values():
+            mesh.release()
+        self.entries.clear()
+        self.resident = 0
+
+    def report(self):
+        return (f"Кэш сеток: попаданий {self.hits}, промахов {self.misses}, "
+                f"в памяти {len(self.entries)} ({self.resident / 2**20:.1f} МБ)")
@@ -1,6 +1,10 @@
+import os
+import sys
 import glfw
 from OpenGL.GL import *
-import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from mesh import uv_sphere
 
 angle_x = 0.0
 angle_y = 0.0
@@ -75,32 +79,12 @@ def draw_rhombus():
         glEnd()
 
 def draw_sphere(sectors, stacks):
-    radius = 1.0
-    for i in range(stacks):
-        theta1 = i * math.pi / stacks
-        theta2 = (i + 1) * math.pi / stacks
-        for j in range(sectors):
-            phi1 = j * 2 * math.pi / sectors
-            phi2 = (j + 1) * 2 * math.pi / sectors
-            p1 = spherical_to_cartesian(radius, theta1, phi1)
-            p2 = spherical_to_cartesian(radius, theta2, phi1)
-            p3 = spherical_to_cartesian(radius, theta2, phi2)
-            p4 = spherical_to_cartesian(radius, theta1, phi2)
-            glColor3f(0.2, 0.4, 1.0)
-            glBegin(GL_TRIANGLES)
-            glVertex3f(*p1)
-            glVertex3f(*p2)
-            glVertex3f(*p3)
-            glVertex3f(*p1)
-            glVertex3f(*p3)
-            glVertex3f(*p4)
-            glEnd()
-
-def spherical_to_cartesian(r, theta, phi):
-    x = r * math.sin(theta) * math.cos(phi)
-    y = r * math.sin(theta) * math.sin(phi)
-    z = r * math.cos(theta)
-    return (x, y, z)
+    positions, _, _, indices = uv_sphere(sectors, stacks)
+    glColor3f(0.2, 0.4, 1.0)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, positions)
+    glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, indices)
+    glDisableClientState(GL_VERTEX_ARRAY)
 
 def key_callback(window, key, scancode, action, mods):
     global angle_x, angle_y, angle_z, wireframe, sectors, stacks
@@ -0,0 +1,54 @@
+import math
+import random
+import time
+import lab4
+
+SIZES = (1000, 5000, 20000)
+
+
+def star_polygon(n, width, height, seed=0):
+    rnd = random.Random(seed)
+    cx, cy = width // 2, height // 2
+    r_max = min(width, height) // 2 - 2
+    points = []
+    for i in range(n):
+        a = 2 * math.pi * i / n
+        r = rnd.uniform(0.6, 1.0) * r_max
+        points.append((int(cx + r * math.cos(a)), int(cy + r * math.sin(a))))
+    return points
+
+
+def fill(mode, polygon):
+    if mode == "seed":
+        cx = sum(p[0] for p in polygon) // len(polygon)
+        cy = sum(p[1] for p in polygon) // len(polygon)
+        lab4.boundary_fill(cx, cy, (0.0, 0.0, 0.0), (0.5, 0.5, 0.5))
+    else:
+        lab4.scanline_fill(lab4.draw_buffer, polygon, (0.5, 0.5, 0.5), mode)
+
+
+def measure(mode, polygon, repeats=3):
+    lab4.points[:] = polygon
+    lab4.fill_mode = mode
+    best = float("inf")
+    for _ in range(repeats):
+        lab4.clear_draw_buffer(silent=True)
+        for i in range(len(polygon)):
+            lab4.bresenham_line(*polygon[i - 1], *polygon[i])
+        start = time.perf_counter()
+        fill(mode, polygon)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    lab4.init_draw_buffer(2048, 2048)
+    print(f"{'вершин':>8} " + " ".join(f"{mode:>10}" for mode in lab4.FILL_MODES))
+    for n in SIZES:
+        polygon = star_polygon(n, *lab4.original_buffer_size)
+        times = [measure(mode, polygon) for mode in lab4.FILL_MODES]
+        print(f"{n:>8} " + " ".join(f"{t * 1000:>8.1f}мс" for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+from tiles import TileRasterizer
+
+WORKERS = (1, 2, 4, 8)
+WIDTH, HEIGHT = 3840, 2160
+
+
+def random_polygons(count, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform((0, 0), (WIDTH, HEIGHT), (count, 2))
+    polygons = []
+    for center in centers:
+        n = int(rng.integers(3, 40))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+        radii = rng.uniform(10, 120, n)
+        polygons.append(center + np.column_stack((np.cos(angles), np.sin(angles))) * radii[:, None])
+    return polygons
+
+
+def measure(action, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    polygons = random_polygons(2000)
+    pixels = WIDTH * HEIGHT
+    print(f"Холст {WIDTH}x{HEIGHT}, {len(polygons)} многоугольников")
+    print(f"{'потоки':>7} {'заливка':>12} {'фильтр':>12}")
+    for workers in WORKERS:
+        with TileRasterizer(WIDTH, HEIGHT, workers=workers) as raster:
+            raster.fill_polygons(polygons[:8])
+            raster.apply_filter("box", 1)
+            fill = measure(lambda: raster.fill_polygons(polygons))
+            blur = measure(lambda: raster.apply_filter("gauss", 8))
+        print(f"{workers:>7} {len(polygons) / fill:>8.0f} п/с {pixels / blur / 1e6:>8.1f} Мп/с")
+
+
+if __name__ == "__main__":
+    main()
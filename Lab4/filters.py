@@ -0,0 +1,77 @@
+import math
+import numpy as np
+
+FILTERS = ("box", "tent", "gauss")
+
+
+def running_sum(data, axis):
+    shape = list(data.shape)
+    shape[axis] += 1
+    sums = np.empty(shape, dtype=np.float32)
+    if axis == 0:
+        sums[0] = 0
+        for i in range(data.shape[0]):
+            np.add(sums[i], data[i], out=sums[i + 1])
+    else:
+        sums[:, 0] = 0
+        np.cumsum(data, axis=1, dtype=np.float32, out=sums[:, 1:])
+    return sums
+
+
+def box_pass(data, axis, lo, hi):
+    n = data.shape[axis]
+    pad = [(0, 0)] * data.ndim
+    pad[axis] = (lo, hi)
+    sums = running_sum(np.pad(data, pad, mode="edge"), axis)
+    width = lo + hi + 1
+    if axis == 0:
+        out = sums[width:] - sums[:n]
+    else:
+        out = sums[:, width:] - sums[:, :n]
+    out *= 1.0 / width
+    return out
+
+
+def box_blur(data, radius):
+    for axis in (0, 1):
+        data = box_pass(data, axis, radius, radius)
+    return data
+
+
+def tent_blur(data, radius):
+    lo = radius // 2
+    hi = radius - lo
+    for axis in (0, 1):
+        data = box_pass(data, axis, lo, hi)
+        data = box_pass(data, axis, hi, lo)
+    return data
+
+
+def gauss_boxes(sigma, passes=3):
+    ideal = math.sqrt(12 * sigma * sigma / passes + 1)
+    lower = int(ideal)
+    if lower % 2 == 0:
+        lower -= 1
+    upper = lower + 2
+    m = round((12 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    return [(lower if i < m else upper) // 2 for i in range(passes)]
+
+
+def gauss_blur(data, radius):
+    for r in gauss_boxes(radius):
+        data = box_blur(data, r)
+    return data
+
+
+def apply_filter(pixels, kind="box", radius=1):
+    if radius < 1:
+        return pixels.copy()
+    if kind == "box":
+        out = box_blur(pixels, radius)
+    elif kind == "tent":
+        out = tent_blur(pixels, radius)
+    elif kind == "gauss":
+        out = gauss_blur(pixels, radius)
+    else:
+        raise ValueError(f"Неизвестный фильтр: {kind}")
+    return np.clip(out + 0.5, 0, 255).astype(np.uint8)
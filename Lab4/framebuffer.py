@@ -0,0 +1,169 @@
+import numpy as np
+
+
+def to_rgb(color):
+    return np.array([int(c * 255) for c in color], dtype=np.uint8)
+
+
+def intersect(a, b):
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[2], b[2]), min(a[3], b[3])
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return (x0, y0, x1, y1)
+
+
+def union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+class Framebuffer:
+    def __init__(self, width, height, color=(1.0, 1.0, 1.0), pixels=None):
+        self.width = width
+        self.height = height
+        if pixels is None:
+            pixels = np.empty((height, width, 3), dtype=np.uint8)
+            pixels[:] = to_rgb(color)
+        self.pixels = pixels
+        self.cells = self.pixels.view("V3").reshape(height, width)
+        self.clip = None
+        self.dirty = [(0, 0, width, height)]
+        self.touched = None
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def view(self):
+        return self.pixels
+
+    def flat(self):
+        return self.pixels.reshape(-1)
+
+    def bounds(self):
+        if self.clip is None:
+            return (0, 0, self.width, self.height)
+        return intersect(self.clip, (0, 0, self.width, self.height)) or (0, 0, 0, 0)
+
+    def mark_dirty(self, rect):
+        rect = intersect(rect, (0, 0, self.width, self.height))
+        if rect is None:
+            return
+        self.touched = rect if self.touched is None else union(self.touched, rect)
+        self.dirty.append(rect)
+        if len(self.dirty) > 32:
+            merged = self.dirty[0]
+            for other in self.dirty[1:]:
+                merged = union(merged, other)
+            self.dirty = [merged]
+
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, []
+        return dirty
+
+    def take_touched(self):
+        touched, self.touched = self.touched, None
+        return touched
+
+    def region(self, x0, y0, x1, y1):
+        rect = intersect((x0, y0, x1, y1), self.bounds())
+        if rect is None:
+            return None
+        return self.pixels[rect[1]:rect[3], rect[0]:rect[2]]
+
+    def fill(self, color, rect=None):
+        rect = intersect(rect or self.bounds(), self.bounds())
+        if rect is None:
+            return
+        x0, y0, x1, y1 = rect
+        self.pixels[y0:y1, x0:x1] = to_rgb(color)
+        self.mark_dirty(rect)
+
+    def blit(self, src, x=0, y=0):
+        h, w = src.shape[:2]
+        rect = intersect((x, y, x + w, y + h), self.bounds())
+        if rect is None:
+            return
+        x0, y0, x1, y1 = rect
+        self.pixels[y0:y1, x0:x1] = src[y0 - y:y1 - y, x0 - x:x1 - x]
+        self.mark_dirty(rect)
+
+    def write_span(self, y, x0, x1, color):
+        self.write_spans([y], [x0], [x1], color)
+
+    def write_spans(self, ys, x0s, x1s, color):
+        bx0, by0, bx1, by1 = self.bounds()
+        ys = np.asarray(ys)
+        x0s = np.maximum(np.asarray(x0s), bx0)
+        x1s = np.minimum(np.asarray(x1s), bx1 - 1)
+        keep = (ys >= by0) & (ys < by1) & (x0s <= x1s)
+        ys, x0s, x1s = ys[keep], x0s[keep], x1s[keep]
+        if len(ys) == 0:
+            return
+        rgb = to_rgb(color)
+        top = int(ys.min())
+        rows = int(ys.max()) - top + 1
+        left = int(x0s.min())
+        width = int(x1s.max()) + 1 - left
+        self.mark_dirty((left, top, left + width, top + rows))
+        if (x1s - x0s + 1).sum() >= 64 * len(ys):
+            for y, x0, x1 in zip(ys.tolist(), x0s.tolist(), x1s.tolist()):
+                self.pixels[y, x0:x1 + 1] = rgb
+            return
+        stride = width + 1
+        edges = np.bincount((ys - top) * stride + x0s - left, minlength=rows * stride)
+        edges -= np.bincount((ys - top) * stride + x1s + 1 - left, minlength=rows * stride)
+        mask = np.cumsum(edges.reshape(rows, stride), axis=1)[:, :width] > 0
+        np.copyto(self.cells[top:top + rows, left:left + width], rgb.view("V3")[0], where=mask)
+
+    def write_pixels(self, xs, ys, color):
+        bx0, by0, bx1, by1 = self.bounds()
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        keep = (xs >= bx0) & (xs < bx1) & (ys >= by0) & (ys < by1)
+        xs, ys = xs[keep], ys[keep]
+        if len(xs) == 0:
+            return
+        self.cells.reshape(-1)[ys * self.width + xs] = to_rgb(color).view("V3")[0]
+        self.mark_dirty((int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1))
+
+    def blend_pixels(self, xs, ys, color, alpha):
+        bx0, by0, bx1, by1 = self.bounds()
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float32), xs.shape)
+        keep = (xs >= bx0) & (xs < bx1) & (ys >= by0) & (ys < by1) & (alpha > 0)
+        xs, ys, alpha = xs[keep], ys[keep], alpha[keep]
+        if len(xs) == 0:
+            return
+        flat = self.pixels.reshape(-1, 3)
+        index = ys * self.width + xs
+        src = flat[index].astype(np.float32)
+        src += (to_rgb(color).astype(np.float32) - src) * alpha[:, None]
+        flat[index] = (src + 0.5).astype(np.uint8)
+        self.mark_dirty((int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1))
+
+    def write_mask(self, mask, color, x=0, y=0):
+        h, w = mask.shape
+        rect = intersect((x, y, x + w, y + h), self.bounds())
+        if rect is None:
+            return
+        x0, y0, x1, y1 = rect
+        np.copyto(self.cells[y0:y1, x0:x1], to_rgb(color).view("V3")[0],
+                  where=mask[y0 - y:y1 - y, x0 - x:x1 - x])
+        self.mark_dirty(rect)
+
+    def match(self, color):
+        return np.all(self.pixels == to_rgb(color), axis=2)
+
+    def set_pixel(self, x, y, color):
+        bx0, by0, bx1, by1 = self.bounds()
+        if bx0 <= x < bx1 and by0 <= y < by1:
+            self.pixels[y, x] = to_rgb(color)
+            self.mark_dirty((x, y, x + 1, y + 1))
+
+    def get_pixel(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            r, g, b = self.pixels[y, x]
+            return (r / 255.0, g / 255.0, b / 255.0)
+        return (1.0, 1.0, 1.0)
@@ -0,0 +1,86 @@
+import zlib
+from collections import deque
+import numpy as np
+
+
+class Delta:
+    __slots__ = ("rect", "before", "after", "state_before", "state_after", "nbytes")
+
+    def __init__(self, rect, before, after, state_before, state_after):
+        self.rect = rect
+        self.before = zlib.compress(before.tobytes(), 1)
+        self.after = zlib.compress(after.tobytes(), 1)
+        self.state_before = state_before
+        self.state_after = state_after
+        self.nbytes = len(self.before) + len(self.after) + 16 * (len(state_before) + len(state_after))
+
+    def pixels(self, data):
+        x0, y0, x1, y1 = self.rect
+        return np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(y1 - y0, x1 - x0, 3)
+
+
+class History:
+    def __init__(self, framebuffer, budget=8 * 1024 * 1024, state=()):
+        self.framebuffer = framebuffer
+        self.budget = budget
+        self.base = framebuffer.pixels.copy()
+        framebuffer.take_touched()
+        self.state = tuple(state)
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.used = 0
+
+    def commit(self, state):
+        state = tuple(state)
+        touched = self.framebuffer.take_touched() or (0, 0, 0, 0)
+        tx0, ty0, tx1, ty1 = touched
+        changed = np.any(self.framebuffer.pixels[ty0:ty1, tx0:tx1] != self.base[ty0:ty1, tx0:tx1], axis=2)
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows) == 0 and state == self.state:
+            return False
+        if len(rows):
+            cols = np.flatnonzero(changed.any(axis=0))
+            rect = (tx0 + int(cols[0]), ty0 + int(rows[0]), tx0 + int(cols[-1]) + 1, ty0 + int(rows[-1]) + 1)
+        else:
+            rect = (0, 0, 0, 0)
+        x0, y0, x1, y1 = rect
+        after = self.framebuffer.pixels[y0:y1, x0:x1]
+        delta = Delta(rect, self.base[y0:y1, x0:x1], after, self.state, state)
+        self.base[y0:y1, x0:x1] = after
+        self.state = state
+        for dropped in self.redo_stack:
+            self.used -= dropped.nbytes
+        self.redo_stack.clear()
+        self.undo_stack.append(delta)
+        self.used += delta.nbytes
+        self.evict()
+        return True
+
+    def evict(self):
+        while self.used > self.budget and (self.undo_stack or self.redo_stack):
+            dropped = self.undo_stack.popleft() if self.undo_stack else self.redo_stack.pop(0)
+            self.used -= dropped.nbytes
+
+    def apply(self, delta, data, state):
+        x0, y0, x1, y1 = delta.rect
+        if x1 > x0 and y1 > y0:
+            pixels = delta.pixels(data)
+            self.framebuffer.blit(pixels, x0, y0)
+            self.base[y0:y1, x0:x1] = pixels
+        self.framebuffer.take_touched()
+        self.state = state
+        return list(state)
+
+    def undo(self):
+        if not self.undo_stack:
+            return None
+        delta = self.undo_stack.pop()
+        self.redo_stack.append(delta)
+        return self.apply(delta, delta.before, delta.state_before)
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        delta = self.redo_stack.pop()
+        self.undo_stack.append(delta)
+        return self.apply(delta, delta.after, delta.state_after)
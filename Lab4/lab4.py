@@ -1,181 +1,213 @@
 import glfw
 from OpenGL.GL import *
+import numpy as np
+from framebuffer import Framebuffer
+from filters import FILTERS, apply_filter
+from scanline import FILL_RULES, scanline_fill, coverage_fill
+from presenter import TexturePresenter
+from lines import draw_lines, draw_lines_aa
+from history import History
 
 points = []
 original_buffer_size = (640, 640)  
 current_window_size = (640, 640)   
 draw_buffer = None  
+presenter = None
+history = None
+HISTORY_BUDGET = 8 * 1024 * 1024
+filter_kind = "box"
+filter_radius = 1
+FILL_MODES = ("seed",) + FILL_RULES
+fill_mode = "evenodd"
+antialias = False
+canvas_pure = True
 
 def init_draw_buffer(width, height):
-    global draw_buffer, original_buffer_size
+    global draw_buffer, original_buffer_size, history
     original_buffer_size = (width, height)
-    draw_buffer = bytearray([255] * (width * height * 3))  
+    draw_buffer = Framebuffer(width, height)
+    history = History(draw_buffer, HISTORY_BUDGET, points)
+
+def record():
+    if history is not None:
+        history.commit(points)
+
+def undo(redo=False):
+    global canvas_pure
+    state = history.redo() if redo else history.undo()
+    if state is None:
+        print("Нечего повторять" if redo else "Нечего отменять")
+        return
+    points[:] = state
+    canvas_pure = False
+    print(f"{'Повтор' if redo else 'Отмена'}: точек {len(points)}, "
+          f"история {len(history.undo_stack)}/{len(history.redo_stack)}, {history.used} байт")
 
 def clear_draw_buffer(silent=False):
-    global draw_buffer
     if draw_buffer is not None:
-        draw_buffer = bytearray([255] * (original_buffer_size[0] * original_buffer_size[1] * 3))
+        draw_buffer.fill((1.0, 1.0, 1.0))
     if not silent:
         print("Холст очищен")
 
 def set_pixel(x, y, color=(0.0, 0.0, 0.0)):
-    global draw_buffer, original_buffer_size
-    if 0 <= x < original_buffer_size[0] and 0 <= y < original_buffer_size[1]:
-        index = (y * original_buffer_size[0] + x) * 3
-        r = int(color[0] * 255)
-        g = int(color[1] * 255)
-        b = int(color[2] * 255)
-        draw_buffer[index] = r
-        draw_buffer[index+1] = g
-        draw_buffer[index+2] = b
+    draw_buffer.set_pixel(x, y, color)
 
 def get_pixel(x, y):
-    global draw_buffer, original_buffer_size
-    if 0 <= x < original_buffer_size[0] and 0 <= y < original_buffer_size[1]:
-        index = (y * original_buffer_size[0] + x) * 3
-        r = draw_buffer[index] / 255.0
-        g = draw_buffer[index+1] / 255.0
-        b = draw_buffer[index+2] / 255.0
-        return (r, g, b)
-    return (1.0, 1.0, 1.0) 
-
-def bresenham_line(x0, y0, x1, y1):
-    dx = abs(x1 - x0)
-    dy = abs(y1 - y0)
-    x, y = x0, y0
-    sx = -1 if x0 > x1 else 1
-    sy = -1 if y0 > y1 else 1
-    if dx > dy:
-        err = dx / 2.0
-        while x != x1:
-            set_pixel(x, y)
-            err -= dy
-            if err < 0:
-                y += sy
-                err += dx
-            x += sx
-    else:
-        err = dy / 2.0
-        while y != y1:
-            set_pixel(x, y)
-            err -= dx
-            if err < 0:
-                x += sx
-                err += dy
-            y += sy
-    set_pixel(x, y)
+    return draw_buffer.get_pixel(x, y)
+
+def bresenham_line(x0, y0, x1, y1, color=(0.0, 0.0, 0.0)):
+    draw_lines(draw_buffer, [(x0, y0, x1, y1)], color)
 
 def boundary_fill(x, y, boundary_color, fill_color):
+    width, height = original_buffer_size
+    blocked = draw_buffer.match(boundary_color) | draw_buffer.match(fill_color)
+    filled = np.zeros_like(blocked)
     stack = [(x, y)]
-    boundary_rgb = tuple(int(c * 255) for c in boundary_color)
-    fill_rgb = tuple(int(c * 255) for c in fill_color) 
     while stack:
         x, y = stack.pop()
-        if (x < 0 or x >= original_buffer_size[0] or 
-            y < 0 or y >= original_buffer_size[1]):
+        if x < 0 or x >= width or y < 0 or y >= height:
+            continue
+        row = blocked[y]
+        if row[x]:
             continue
-        index = (y * original_buffer_size[0] + x) * 3
-        pixel = (draw_buffer[index], draw_buffer[index+1], draw_buffer[index+2])
-        if pixel != boundary_rgb and pixel != fill_rgb:
-            left = x
-            while left >= 0:
-                idx = (y * original_buffer_size[0] + left) * 3
-                px = (draw_buffer[idx], draw_buffer[idx+1], draw_buffer[idx+2])
-                if px == boundary_rgb or px == fill_rgb:
-                    break
-                left -= 1
-            left += 1
-            right = x
-            while right < original_buffer_size[0]:
-                idx = (y * original_buffer_size[0] + right) * 3
-                px = (draw_buffer[idx], draw_buffer[idx+1], draw_buffer[idx+2])
-                if px == boundary_rgb or px == fill_rgb:
-                    break
-                right += 1
-            right -= 1
-            for i in range(left, right + 1):
-                idx = (y * original_buffer_size[0] + i) * 3
-                draw_buffer[idx:idx+3] = fill_rgb
-            for ny in [y - 1, y + 1]:
-                if 0 <= ny < original_buffer_size[1]:
-                    add_to_stack = False
-                    for i in range(left, right + 1):
-                        idx = (ny * original_buffer_size[0] + i) * 3
-                        px = (draw_buffer[idx], draw_buffer[idx+1], draw_buffer[idx+2])
-                        if px != boundary_rgb and px != fill_rgb:
-                            if not add_to_stack:
-                                stack.append((i, ny))
-                                add_to_stack = True
-                        else:
-                            add_to_stack = False
-
-def apply_box_filter():
-    global draw_buffer
+        stops = np.flatnonzero(row[:x])
+        left = stops[-1] + 1 if len(stops) else 0
+        stops = np.flatnonzero(row[x:])
+        right = x + stops[0] - 1 if len(stops) else width - 1
+        row[left:right + 1] = True
+        filled[y, left:right + 1] = True
+        for ny in (y - 1, y + 1):
+            if 0 <= ny < height:
+                free = ~blocked[ny, left:right + 1]
+                starts = np.flatnonzero(free & ~np.concatenate(([False], free[:-1])))
+                stack.extend((left + int(i), ny) for i in starts)
+    draw_buffer.write_mask(filled, fill_color)
+
+def apply_post_filter():
+    global canvas_pure
     if draw_buffer is None:
         return
-    new_buffer = bytearray(draw_buffer)
-    width, height = original_buffer_size
-    for y in range(1, height - 1):
-        for x in range(1, width - 1):
-            neighbors = []
-            for dy in [-1, 0, 1]:
-                for dx in [-1, 0, 1]:
-                    idx = ((y + dy) * width + (x + dx)) * 3
-                    r = draw_buffer[idx] / 255.0
-                    g = draw_buffer[idx+1] / 255.0
-                    b = draw_buffer[idx+2] / 255.0
-                    neighbors.append((r, g, b))
-            avg_r = sum(c[0] for c in neighbors) / 9
-            avg_g = sum(c[1] for c in neighbors) / 9
-            avg_b = sum(c[2] for c in neighbors) / 9
-            idx = (y * width + x) * 3
-            new_buffer[idx] = int(avg_r * 255)
-            new_buffer[idx+1] = int(avg_g * 255)
-            new_buffer[idx+2] = int(avg_b * 255)
-    draw_buffer = new_buffer
-    print("Применена постфильтрация")
+    canvas_pure = False
+    draw_buffer.blit(apply_filter(draw_buffer.pixels, filter_kind, filter_radius))
+    print(f"Применена постфильтрация: {filter_kind}, радиус {filter_radius}")
+
+def polygon_edges():
+    pts = np.asarray(points)
+    return np.hstack((pts, np.roll(pts, -1, axis=0)))
+
+def fill_rule():
+    return "evenodd" if fill_mode == "seed" else fill_mode
 
 def draw_polygon():
+    global canvas_pure
+    canvas_pure = True
     if len(points) < 2:
         return
-    for i in range(len(points) - 1):
-        bresenham_line(points[i][0], points[i][1], points[i+1][0], points[i+1][1])
+    edges = polygon_edges() if len(points) >= 3 else polygon_edges()[:1]
+    if antialias:
+        if len(points) >= 3:
+            coverage_fill(draw_buffer, points, (0.5, 0.5, 0.5), fill_rule())
+        draw_lines_aa(draw_buffer, edges - 0.5)
+        return
+    if len(points) >= 3 and fill_mode != "seed":
+        scanline_fill(draw_buffer, points, (0.5, 0.5, 0.5), fill_mode)
+    draw_lines(draw_buffer, edges)
     if len(points) >= 3:
-        bresenham_line(points[-1][0], points[-1][1], points[0][0], points[0][1])
-        cx = sum(p[0] for p in points) // len(points)
-        cy = sum(p[1] for p in points) // len(points)
-        boundary_fill(cx, cy, (0.0, 0.0, 0.0), (0.5, 0.5, 0.5))
+        if fill_mode == "seed":
+            cx = sum(p[0] for p in points) // len(points)
+            cy = sum(p[1] for p in points) // len(points)
+            boundary_fill(cx, cy, (0.0, 0.0, 0.0), (0.5, 0.5, 0.5))
+
+def redraw_region(rect):
+    if len(points) < 3 or (fill_mode == "seed" and not antialias):
+        clear_draw_buffer(silent=True)
+        draw_polygon()
+        return
+    x0, y0, x1, y1 = rect
+    draw_buffer.clip = rect
+    draw_buffer.fill((1.0, 1.0, 1.0))
+    edges = polygon_edges()
+    touching = ((np.minimum(edges[:, 0], edges[:, 2]) <= x1) & (np.maximum(edges[:, 0], edges[:, 2]) >= x0 - 1) &
+                (np.minimum(edges[:, 1], edges[:, 3]) <= y1) & (np.maximum(edges[:, 1], edges[:, 3]) >= y0 - 1))
+    if antialias:
+        coverage_fill(draw_buffer, points, (0.5, 0.5, 0.5), fill_rule(), rows=(y0, y1))
+        draw_lines_aa(draw_buffer, edges[touching] - 0.5)
+    else:
+        scanline_fill(draw_buffer, points, (0.5, 0.5, 0.5), fill_mode, rows=(y0, y1))
+        draw_lines(draw_buffer, edges[touching])
+    draw_buffer.clip = None
+
+def add_point(x, y):
+    points.append((x, y))
+    if not canvas_pure:
+        clear_draw_buffer(silent=True)
+        draw_polygon()
+        return
+    if len(points) < 2:
+        return
+    triangle = (points[-2], points[-1], points[0])
+    xs = [p[0] for p in triangle]
+    ys = [p[1] for p in triangle]
+    redraw_region((min(xs) - 1, min(ys) - 1, max(xs) + 2, max(ys) + 2))
 
 def display(window):
     glClear(GL_COLOR_BUFFER_BIT)
-    if draw_buffer is not None:
-        glPixelZoom(
-            current_window_size[0] / original_buffer_size[0],
-            current_window_size[1] / original_buffer_size[1]
-        )
-        glDrawPixels(original_buffer_size[0], original_buffer_size[1], 
-                    GL_RGB, GL_UNSIGNED_BYTE, draw_buffer)
+    if presenter is not None:
+        presenter.update()
+        presenter.draw()
     glfw.swap_buffers(window)
     glfw.poll_events()
 
 def key_callback(window, key, scancode, action, mods):
+    global filter_kind, filter_radius, fill_mode, antialias, canvas_pure
     if action == glfw.PRESS:
-        if key == glfw.KEY_ESCAPE:
+        if key == glfw.KEY_Z and mods & glfw.MOD_CONTROL:
+            undo(redo=bool(mods & glfw.MOD_SHIFT))
+        elif key == glfw.KEY_Y and mods & glfw.MOD_CONTROL:
+            undo(redo=True)
+        elif key == glfw.KEY_ESCAPE:
             points.clear()
             clear_draw_buffer()
+            canvas_pure = True
+            record()
         elif key == glfw.KEY_P:
-            apply_box_filter()
+            apply_post_filter()
+            record()
+        elif key == glfw.KEY_F:
+            filter_kind = FILTERS[(FILTERS.index(filter_kind) + 1) % len(FILTERS)]
+            print(f"Фильтр: {filter_kind}")
+        elif key == glfw.KEY_EQUAL:
+            filter_radius += 1
+            print(f"Радиус фильтра: {filter_radius}")
+        elif key == glfw.KEY_MINUS:
+            filter_radius = max(1, filter_radius - 1)
+            print(f"Радиус фильтра: {filter_radius}")
+        elif key == glfw.KEY_M:
+            fill_mode = FILL_MODES[(FILL_MODES.index(fill_mode) + 1) % len(FILL_MODES)]
+            print(f"Режим заливки: {fill_mode}")
+            if len(points) >= 3:
+                clear_draw_buffer(silent=True)
+                draw_polygon()
+                record()
+        elif key == glfw.KEY_A:
+            antialias = not antialias
+            print(f"Сглаживание: {'ВКЛ' if antialias else 'ВЫКЛ'}")
+            if len(points) >= 2:
+                clear_draw_buffer(silent=True)
+                draw_polygon()
+                record()
+        elif key == glfw.KEY_U and presenter is not None:
+            print(f"Загружено в текстуру: {presenter.bytes_uploaded} байт за кадр, "
+                  f"{presenter.total_uploaded} байт за {presenter.frames} кадров")
 
 def mouse_button_callback(window, button, action, mods):
     if button == glfw.MOUSE_BUTTON_LEFT and action == glfw.PRESS:
         xpos, ypos = glfw.get_cursor_pos(window)
         x = int(xpos * original_buffer_size[0] / current_window_size[0])
         y = original_buffer_size[1] - int(ypos * original_buffer_size[1] / current_window_size[1]) - 1
-        points.append((x, y))
+        add_point(x, y)
+        record()
         print(f"Добавлена точка: ({x}, {y})")
-        if len(points) >= 2:
-            clear_draw_buffer(silent=True)
-            draw_polygon()
 
 def window_size_callback(window, width, height):
     global current_window_size
@@ -183,6 +215,7 @@ def window_size_callback(window, width, height):
     glViewport(0, 0, width, height)
 
 def main():
+    global presenter
     if not glfw.init():
         return
     window = glfw.create_window(640, 640, "Lab4", None, None)
@@ -194,8 +227,10 @@ def main():
     glfw.set_mouse_button_callback(window, mouse_button_callback)
     glfw.set_window_size_callback(window, window_size_callback)
     init_draw_buffer(640, 640)
+    presenter = TexturePresenter(draw_buffer)
     while not glfw.window_should_close(window):
         display(window)
+    presenter.release()
     glfw.destroy_window(window)
     glfw.terminate()
 
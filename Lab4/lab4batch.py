@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import numpy as np
+from framebuffer import Framebuffer
+from scanline import FILL_RULES, scanline_fill, coverage_fill
+from lines import draw_lines, draw_lines_aa
+from filters import FILTERS, apply_filter
+
+
+def write_ppm(path, pixels):
+    height, width = pixels.shape[:2]
+    with open(path, "wb") as f:
+        f.write(f"P6\n{width} {height}\n255\n".encode())
+        f.write(np.ascontiguousarray(pixels[::-1]).tobytes())
+
+
+def write_png(path, pixels):
+    height, width = pixels.shape[:2]
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels[::-1].reshape(height, -1)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+WRITERS = {"png": write_png, "ppm": write_ppm}
+
+
+def render_job(job):
+    framebuffer = Framebuffer(job["width"], job["height"])
+    for points in job["polygons"]:
+        points = np.asarray(points, dtype=np.float64)
+        if len(points) < 2:
+            continue
+        edges = np.hstack((points, np.roll(points, -1, axis=0)))
+        if len(points) < 3:
+            edges = edges[:1]
+        if job["antialias"]:
+            if len(points) >= 3:
+                coverage_fill(framebuffer, points, (0.5, 0.5, 0.5), job["fill"])
+            draw_lines_aa(framebuffer, edges - 0.5)
+        else:
+            if len(points) >= 3:
+                scanline_fill(framebuffer, points, (0.5, 0.5, 0.5), job["fill"])
+            draw_lines(framebuffer, np.round(edges).astype(np.int64))
+    if job["filter"] != "none":
+        framebuffer.blit(apply_filter(framebuffer.pixels, job["filter"], job["radius"]))
+    WRITERS[job["format"]](job["output"], framebuffer.pixels)
+    return job["output"]
+
+
+def read_jobs(stream, args):
+    index = 0
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name = f"{index:06d}"
+        index += 1
+        try:
+            data = json.loads(line)
+            if isinstance(data, list):
+                data = {"polygons": data}
+            job = {
+                "width": args.width,
+                "height": args.height,
+                "fill": args.fill,
+                "filter": args.filter,
+                "radius": args.radius,
+                "antialias": args.aa,
+                "format": args.format,
+            }
+            job.update(data)
+            job.setdefault("output", os.path.join(args.outdir, f"{name}.{job['format']}"))
+        except Exception as error:
+            yield number, None, f"{type(error).__name__}: {error}"
+            continue
+        yield number, job, None
+
+
+def render_entry(entry):
+    number, job, error = entry
+    if error is not None:
+        return entry
+    try:
+        return number, render_job(job), None
+    except Exception as failure:
+        return number, None, f"{type(failure).__name__}: {failure}"
+
+
+def run(entries, workers=1):
+    if workers <= 1:
+        for entry in entries:
+            yield render_entry(entry)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for entry in entries:
+            pending.append(pool.submit(render_entry, entry))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная растеризация многоугольников без окна")
+    parser.add_argument("input", nargs="?", default="-", help="файл заданий JSON Lines или - для stdin")
+    parser.add_argument("--outdir", default=".")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="png")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=640)
+    parser.add_argument("--fill", choices=FILL_RULES, default="evenodd")
+    parser.add_argument("--filter", choices=("none",) + FILTERS, default="none")
+    parser.add_argument("--radius", type=int, default=1)
+    parser.add_argument("--aa", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    os.makedirs(args.outdir, exist_ok=True)
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    count = errors = 0
+    with stream:
+        for number, path, error in run(read_jobs(stream, args), args.workers):
+            if error is not None:
+                errors += 1
+                print(f"Строка {number}: {error}", file=sys.stderr)
+                continue
+            count += 1
+            print(f"Сохранено: {path}")
+    print(f"Обработано заданий: {count}, ошибок: {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import numpy as np
+
+CHUNK_PIXELS = 1 << 22
+
+
+def segment_pixels(segments):
+    seg = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    x0, y0, x1, y1 = seg.T
+    dx = np.abs(x1 - x0)
+    dy = np.abs(y1 - y0)
+    sx = np.where(x0 > x1, -1, 1)
+    sy = np.where(y0 > y1, -1, 1)
+    x_major = dx > dy
+    major = np.where(x_major, dx, dy)
+    minor = np.where(x_major, dy, dx)
+    counts = major + 1
+    index = np.repeat(np.arange(len(seg)), counts)
+    k = np.arange(len(index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    m = major[index]
+    step = -((m - 2 * k * minor[index]) // np.maximum(2 * m, 1))
+    along_x = x_major[index]
+    xs = x0[index] + sx[index] * np.where(along_x, k, step)
+    ys = y0[index] + sy[index] * np.where(along_x, step, k)
+    return xs, ys
+
+
+def chunks(segments, dtype=np.int64):
+    seg = np.asarray(segments, dtype=dtype).reshape(-1, 4)
+    span = seg.astype(np.float64)
+    lengths = np.ceil(np.maximum(np.abs(span[:, 2] - span[:, 0]), np.abs(span[:, 3] - span[:, 1]))) + 1
+    ends = np.cumsum(lengths)
+    start = 0
+    while start < len(seg):
+        limit = (ends[start - 1] if start else 0) + CHUNK_PIXELS
+        stop = max(int(np.searchsorted(ends, limit, side="right")), start + 1)
+        yield seg[start:stop]
+        start = stop
+
+
+def draw_lines(framebuffer, segments, color=(0.0, 0.0, 0.0)):
+    for part in chunks(segments):
+        xs, ys = segment_pixels(part)
+        framebuffer.write_pixels(xs, ys, color)
+
+
+def wu_pixels(segments):
+    seg = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    steep = np.abs(seg[:, 3] - seg[:, 1]) > np.abs(seg[:, 2] - seg[:, 0])
+    a0 = np.where(steep, seg[:, 1], seg[:, 0])
+    b0 = np.where(steep, seg[:, 0], seg[:, 1])
+    a1 = np.where(steep, seg[:, 3], seg[:, 2])
+    b1 = np.where(steep, seg[:, 2], seg[:, 3])
+    swap = a0 > a1
+    a0, a1 = np.where(swap, a1, a0), np.where(swap, a0, a1)
+    b0, b1 = np.where(swap, b1, b0), np.where(swap, b0, b1)
+    span = a1 - a0
+    gradient = np.divide(b1 - b0, span, out=np.zeros_like(span), where=span != 0)
+    start = np.floor(a0 + 0.5).astype(np.int64)
+    counts = np.floor(a1 + 0.5).astype(np.int64) - start + 1
+    index = np.repeat(np.arange(len(seg)), counts)
+    a = start[index] + np.arange(len(index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    b = b0[index] + gradient[index] * (a - a0[index])
+    b_int = np.floor(b).astype(np.int64)
+    frac = b - b_int
+    a = np.concatenate((a, a))
+    b = np.concatenate((b_int, b_int + 1))
+    cover = np.concatenate((1 - frac, frac))
+    steep = np.concatenate((steep[index], steep[index]))
+    return np.where(steep, b, a), np.where(steep, a, b), cover
+
+
+def draw_lines_aa(framebuffer, segments, color=(0.0, 0.0, 0.0)):
+    for part in chunks(segments, np.float64):
+        xs, ys, cover = wu_pixels(part)
+        framebuffer.blend_pixels(xs, ys, color, cover)
@@ -0,0 +1,75 @@
+import ctypes
+from OpenGL.GL import *
+import numpy as np
+
+
+class TexturePresenter:
+    def __init__(self, framebuffer):
+        self.framebuffer = framebuffer
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB8, framebuffer.width, framebuffer.height, 0,
+                     GL_RGB, GL_UNSIGNED_BYTE, framebuffer.view())
+        glBindTexture(GL_TEXTURE_2D, 0)
+        framebuffer.take_dirty()
+        self.pbos = glGenBuffers(2)
+        self.pbo_index = 0
+        self.bytes_uploaded = 0
+        self.total_uploaded = 0
+        self.frames = 0
+
+    def update(self):
+        rects = self.framebuffer.take_dirty()
+        self.frames += 1
+        self.bytes_uploaded = 0
+        if not rects:
+            return
+        pixels = self.framebuffer.view()
+        chunks = [np.ascontiguousarray(pixels[y0:y1, x0:x1]) for x0, y0, x1, y1 in rects]
+        total = sum(chunk.nbytes for chunk in chunks)
+        pbo = self.pbos[self.pbo_index]
+        self.pbo_index = 1 - self.pbo_index
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, total, None, GL_STREAM_DRAW)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        offset = 0
+        for (x0, y0, x1, y1), chunk in zip(rects, chunks):
+            glBufferSubData(GL_PIXEL_UNPACK_BUFFER, offset, chunk.nbytes, chunk)
+            glTexSubImage2D(GL_TEXTURE_2D, 0, x0, y0, x1 - x0, y1 - y0,
+                            GL_RGB, GL_UNSIGNED_BYTE, ctypes.c_void_p(offset))
+            offset += chunk.nbytes
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.bytes_uploaded = total
+        self.total_uploaded += total
+
+    def draw(self):
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glColor3f(1.0, 1.0, 1.0)
+        glBegin(GL_QUADS)
+        glTexCoord2f(0.0, 0.0)
+        glVertex2f(-1.0, -1.0)
+        glTexCoord2f(1.0, 0.0)
+        glVertex2f(1.0, -1.0)
+        glTexCoord2f(1.0, 1.0)
+        glVertex2f(1.0, 1.0)
+        glTexCoord2f(0.0, 1.0)
+        glVertex2f(-1.0, 1.0)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+
+    def release(self):
+        glDeleteBuffers(2, self.pbos)
+        glDeleteTextures([self.texture])
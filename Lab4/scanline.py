@@ -0,0 +1,84 @@
+import numpy as np
+
+FILL_RULES = ("evenodd", "nonzero")
+
+
+def edge_table(points, rows=None, samples=1):
+    p = np.asarray(points, dtype=np.float64) * (1.0, samples)
+    q = np.roll(p, -1, axis=0)
+    keep = p[:, 1] != q[:, 1]
+    p, q = p[keep], q[keep]
+    direction = np.where(q[:, 1] > p[:, 1], 1, -1)
+    y_start = np.ceil(np.minimum(p[:, 1], q[:, 1]) - 0.5).astype(np.int64)
+    y_stop = np.ceil(np.maximum(p[:, 1], q[:, 1]) - 0.5).astype(np.int64)
+    if rows is not None:
+        y_start = np.maximum(y_start, rows[0] * samples)
+        y_stop = np.minimum(y_stop, rows[1] * samples)
+    counts = np.maximum(y_stop - y_start, 0)
+    edge = np.repeat(np.arange(len(p)), counts)
+    first = np.cumsum(counts) - counts
+    ys = y_start[edge] + np.arange(len(edge)) - first[edge]
+    slope = (q[:, 0] - p[:, 0]) / (q[:, 1] - p[:, 1])
+    xs = p[edge, 0] + (ys + 0.5 - p[edge, 1]) * slope[edge]
+    return ys, xs, direction[edge]
+
+
+def crossing_spans(points, rule="evenodd", rows=None, samples=1):
+    if len(points) < 3:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.astype(np.float64), empty.astype(np.float64)
+    ys, xs, dirs = edge_table(points, rows, samples)
+    order = np.lexsort((xs, ys))
+    ys, xs, dirs = ys[order], xs[order], dirs[order]
+    if rule == "evenodd":
+        start = np.arange(0, len(ys), 2)
+    elif rule == "nonzero":
+        winding = np.cumsum(dirs)
+        start = np.flatnonzero(winding[:-1] != 0)
+    else:
+        raise ValueError(f"Неизвестное правило заливки: {rule}")
+    return ys[start], xs[start], xs[start + 1]
+
+
+def polygon_spans(points, rule="evenodd", rows=None):
+    ys, xl, xr = crossing_spans(points, rule, rows)
+    x0 = np.ceil(xl - 0.5).astype(np.int64)
+    x1 = np.ceil(xr - 0.5).astype(np.int64) - 1
+    return ys, x0, x1
+
+
+def scanline_fill(framebuffer, points, fill_color, rule="evenodd", rows=None):
+    ys, x0, x1 = polygon_spans(points, rule, rows)
+    framebuffer.write_spans(ys, x0, x1, fill_color)
+
+
+def coverage_runs(points, rule="evenodd", rows=None, samples=4):
+    sub, xl, xr = crossing_spans(points, rule, rows, samples)
+    row = sub // samples
+    il = np.floor(xl)
+    ir = np.floor(xr)
+    fl = xl - il
+    fr = xr - ir
+    ys = np.concatenate((row, row, row, row))
+    xs = np.concatenate((il, il + 1, ir, ir + 1)).astype(np.int64)
+    ws = np.concatenate((1 - fl, fl, fr - 1, -fr)) / samples
+    order = np.lexsort((xs, ys))
+    ys, xs = ys[order], xs[order]
+    cover = np.cumsum(ws[order])
+    last = np.ones(len(ys), dtype=bool)
+    last[:-1] = (ys[1:] != ys[:-1]) | (xs[1:] != xs[:-1])
+    ys, xs, cover = ys[last], xs[last], cover[last]
+    run = np.flatnonzero(ys[1:] == ys[:-1])
+    return ys[run], xs[run], xs[run + 1] - 1, np.clip(cover[run], 0.0, 1.0)
+
+
+def coverage_fill(framebuffer, points, fill_color, rule="evenodd", rows=None, samples=4):
+    ys, x0, x1, cover = coverage_runs(points, rule, rows, samples)
+    solid = cover > 1 - 1e-6
+    framebuffer.write_spans(ys[solid], x0[solid], x1[solid], fill_color)
+    partial = ~solid & (cover > 1e-6)
+    ys, x0, x1, cover = ys[partial], x0[partial], x1[partial], cover[partial]
+    lengths = x1 - x0 + 1
+    index = np.repeat(np.arange(len(ys)), lengths)
+    xs = x0[index] + np.arange(len(index)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    framebuffer.blend_pixels(xs, ys[index], fill_color, cover[index])
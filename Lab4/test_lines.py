@@ -0,0 +1,11 @@
+import numpy as np
+from framebuffer import Framebuffer
+from lines import draw_lines_aa
+
+
+def test_corner_aligned_edge_splits_between_rows():
+    framebuffer = Framebuffer(40, 10)
+    draw_lines_aa(framebuffer, np.array([[10, 5, 30, 5]]) - 0.5)
+    rows = np.flatnonzero((framebuffer.pixels[:, 10:30] < 255).any(axis=(1, 2)))
+    assert rows.tolist() == [4, 5]
+    assert np.all(framebuffer.pixels[4:6, 10:30] == 128)
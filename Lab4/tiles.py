@@ -0,0 +1,125 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from framebuffer import Framebuffer, to_rgb
+from scanline import scanline_fill
+from lines import draw_lines
+from filters import apply_filter, gauss_boxes
+
+buffers = {}
+
+
+def attach(names, width, height):
+    for name in names:
+        shm = shared_memory.SharedMemory(name=name)
+        pixels = np.ndarray((height, width, 3), dtype=np.uint8, buffer=shm.buf)
+        buffers[name] = (shm, Framebuffer(width, height, pixels=pixels))
+
+
+def fill_tile(name, rect, polygons, color, rule):
+    framebuffer = buffers[name][1]
+    framebuffer.clip = rect
+    for polygon in polygons:
+        scanline_fill(framebuffer, polygon, color, rule, rows=(rect[1], rect[3]))
+    framebuffer.clip = None
+
+
+def lines_tile(name, rect, segments, color):
+    framebuffer = buffers[name][1]
+    framebuffer.clip = rect
+    draw_lines(framebuffer, segments, color)
+    framebuffer.clip = None
+
+
+def filter_tile(src, dst, rect, halo, kind, radius):
+    source = buffers[src][1]
+    target = buffers[dst][1]
+    x0, y0, x1, y1 = rect
+    hx0, hy0 = max(x0 - halo, 0), max(y0 - halo, 0)
+    hx1, hy1 = min(x1 + halo, source.width), min(y1 + halo, source.height)
+    out = apply_filter(source.pixels[hy0:hy1, hx0:hx1], kind, radius)
+    target.pixels[y0:y1, x0:x1] = out[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+
+
+def filter_support(kind, radius):
+    if kind == "gauss":
+        return sum(gauss_boxes(radius))
+    return radius
+
+
+class TileRasterizer:
+    def __init__(self, width, height, workers=None, tile=256, color=(1.0, 1.0, 1.0)):
+        self.width = width
+        self.height = height
+        self.shms = [shared_memory.SharedMemory(create=True, size=width * height * 3) for _ in range(2)]
+        self.names = [shm.name for shm in self.shms]
+        pixels = np.ndarray((height, width, 3), dtype=np.uint8, buffer=self.shms[0].buf)
+        pixels[:] = to_rgb(color)
+        self.framebuffer = Framebuffer(width, height, pixels=pixels)
+        self.scratch = np.ndarray((height, width, 3), dtype=np.uint8, buffer=self.shms[1].buf)
+        self.tiles = [(x, y, min(x + tile, width), min(y + tile, height))
+                      for y in range(0, height, tile) for x in range(0, width, tile)]
+        self.pool = ProcessPoolExecutor(workers, initializer=attach, initargs=(self.names, width, height))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def bin(self, boxes):
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        bins = []
+        for rect in self.tiles:
+            hit = ((boxes[:, 0] < rect[2]) & (boxes[:, 2] >= rect[0]) &
+                   (boxes[:, 1] < rect[3]) & (boxes[:, 3] >= rect[1]))
+            bins.append(np.flatnonzero(hit))
+        return bins
+
+    def run(self, fn, jobs, rects):
+        if not jobs:
+            return
+        for _ in self.pool.map(fn, *zip(*jobs)):
+            pass
+        for rect in rects:
+            self.framebuffer.mark_dirty(rect)
+
+    def fill_polygons(self, polygons, color=(0.5, 0.5, 0.5), rule="evenodd"):
+        polygons = [np.asarray(p, dtype=np.float64) for p in polygons if len(p) >= 3]
+        boxes = [(p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max()) for p in polygons]
+        jobs = []
+        rects = []
+        for rect, hits in zip(self.tiles, self.bin(boxes)):
+            if len(hits):
+                jobs.append((self.names[0], rect, [polygons[i] for i in hits], color, rule))
+                rects.append(rect)
+        self.run(fill_tile, jobs, rects)
+
+    def draw_lines(self, segments, color=(0.0, 0.0, 0.0)):
+        segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+        boxes = np.column_stack((np.minimum(segments[:, 0], segments[:, 2]),
+                                 np.minimum(segments[:, 1], segments[:, 3]),
+                                 np.maximum(segments[:, 0], segments[:, 2]),
+                                 np.maximum(segments[:, 1], segments[:, 3])))
+        jobs = []
+        rects = []
+        for rect, hits in zip(self.tiles, self.bin(boxes)):
+            if len(hits):
+                jobs.append((self.names[0], rect, segments[hits], color))
+                rects.append(rect)
+        self.run(lines_tile, jobs, rects)
+
+    def apply_filter(self, kind="box", radius=1):
+        halo = filter_support(kind, radius)
+        self.run(filter_tile, [(self.names[0], self.names[1], rect, halo, kind, radius)
+                               for rect in self.tiles], self.tiles)
+        np.copyto(self.framebuffer.pixels, self.scratch)
+
+    def close(self):
+        self.pool.shutdown()
+        self.framebuffer = None
+        self.scratch = None
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+        self.shms = []
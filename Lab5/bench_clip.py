@@ -0,0 +1,56 @@
+import math
+import random
+import time
+from booleans import polygon_boolean
+from clipper import Clipper, sutherland_hodgman
+
+SIZES = (10, 100, 1000, 10000)
+BATCH = 200
+
+
+def star_polygon(n, cx, cy, radius, seed=0):
+    rnd = random.Random(seed)
+    points = []
+    for i in range(n):
+        a = 2 * math.pi * i / n
+        r = rnd.uniform(0.6, 1.0) * radius
+        points.append((cx + r * math.cos(a), cy + r * math.sin(a)))
+    return points
+
+
+def regular_polygon(n, radius):
+    return [(radius * math.cos(2 * math.pi * i / n), radius * math.sin(2 * math.pi * i / n)) for i in range(n)]
+
+
+def measure(fn, subjects, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for subject in subjects:
+            fn(subject)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    clipper = Clipper(regular_polygon(8, 1.0))
+
+    def greiner(subject):
+        return polygon_boolean(subject, clipper.polygon, "intersection", clipper.grid)
+
+    def sutherland(subject):
+        return sutherland_hodgman(subject, clipper.edges, clipper.orientation)
+
+    print(f"{'вершин':>8} {'Грейнер':>10} {'Сазерленд':>10} {'ускорение':>10}")
+    for n in SIZES:
+        rnd = random.Random(n)
+        count = max(1, BATCH * 10 // n)
+        subjects = [star_polygon(n, rnd.uniform(-0.5, 0.5), rnd.uniform(-0.5, 0.5), 0.9, seed=k)
+                    for k in range(count)]
+        gh = measure(greiner, subjects)
+        sh = measure(sutherland, subjects)
+        print(f"{n:>8} {gh * 1000:>8.1f}мс {sh * 1000:>8.1f}мс {gh / sh:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import numpy as np
+from clipper import EdgeGrid, polygon_edges, edge_intersections, find_intersections, points_in_polygon
+
+OPERATIONS = ("intersection", "union", "difference", "xor")
+DEGENERATE_EPS = 1e-10
+PERTURB_SCALE = 1e-7
+PERTURB_TRIES = 8
+SLIVER_AREA = 1e-5
+
+def polygon_boolean(subject, clip, operation="intersection", grid=None):
+    if operation not in OPERATIONS:
+        raise ValueError(f"Неизвестная операция: {operation}")
+    if operation == "xor":
+        return polygon_boolean(subject, clip, "difference", grid) + polygon_boolean(clip, subject, "difference")
+    subject = counter_clockwise(subject)
+    if signed_area(clip) < 0:
+        clip, grid = counter_clockwise(clip), None
+    else:
+        clip = [tuple(p) for p in clip]
+    if len(clip) < 3:
+        return [] if operation == "intersection" or len(subject) < 3 else [(subject, [])]
+    if len(subject) < 3:
+        return [(clip, [])] if operation == "union" else []
+    scale = extent(subject, clip)
+    moved, intersections = separate(subject, clip, scale, grid)
+    points = None if moved is subject else snap_points(subject, moved, clip, intersections)
+    return combine(subject, clip, intersections, operation, scale, np.asarray(moved), np.asarray(clip), points)
+
+def combine(subject, clip, intersections, operation, scale, subject_xy, clip_xy, points=None):
+    if not intersections:
+        return nested_result(subject, clip, operation, subject_xy, clip_xy)
+    xy = np.array([item['point'] for item in intersections], dtype=np.float64)
+    if points is None:
+        points = [item['point'] for item in intersections]
+    subject_edges = np.array([item['subject_edge'][0] for item in intersections])
+    clip_edges = np.array([item['clip_edge'][0] for item in intersections])
+    subject_walk = RingWalk(subject, subject_xy, subject_edges, xy, inside(subject_xy[0], clip_xy),
+                            invert=operation in ("union", "difference"))
+    clip_walk = RingWalk(clip, clip_xy, clip_edges, xy, inside(clip_xy[0], subject_xy),
+                         invert=operation == "union")
+    rings = [drop_redundant(ring, DEGENERATE_EPS * scale) for ring in trace_rings(subject_walk, clip_walk, points)]
+    rings = [ring for ring in rings if ring]
+    areas = [signed_area(ring) for ring in rings]
+    return assign_holes([(ring, area) for ring, area in zip(rings, areas)
+                         if abs(area) > SLIVER_AREA * scale * scale])
+
+def inside(point, polygon):
+    return bool(points_in_polygon([point], polygon)[0])
+
+def extent(subject, clip):
+    pts = np.concatenate((np.asarray(subject, dtype=np.float64).reshape(-1, 2),
+                          np.asarray(clip, dtype=np.float64).reshape(-1, 2)))
+    if len(pts) == 0:
+        return 1.0
+    return float(np.max(pts.max(axis=0) - pts.min(axis=0))) or 1.0
+
+def signed_area(ring):
+    pts = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+    x, y = pts[:, 0], pts[:, 1]
+    return 0.5 * float(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y))
+
+def counter_clockwise(ring):
+    ring = [tuple(p) for p in ring]
+    return ring[::-1] if signed_area(ring) < 0 else ring
+
+def segment_distance(px, py, edges):
+    ax, ay, bx, by = edges.T
+    dx, dy = bx - ax, by - ay
+    length = dx*dx + dy*dy
+    t = np.divide((px - ax)*dx + (py - ay)*dy, length, out=np.zeros_like(length), where=length > 0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(ax + t*dx - px, ay + t*dy - py)
+
+def touching(edges_a, edges_b, i, j, tolerance):
+    a, b = edges_a[i], edges_b[j]
+    touch = np.zeros(len(i), dtype=bool)
+    for p, edges in ((a[:, :2], b), (a[:, 2:], b), (b[:, :2], a), (b[:, 2:], a)):
+        touch |= segment_distance(p[:, 0], p[:, 1], edges) <= tolerance
+    return touch
+
+def is_degenerate(subject_edges, grid, tolerance):
+    i, j = grid.candidates(subject_edges)
+    return bool(np.any(touching(subject_edges, grid.edges, i, j, tolerance)))
+
+def separate(subject, clip, scale, grid=None):
+    if grid is None:
+        grid = EdgeGrid(polygon_edges(clip))
+    rng = np.random.default_rng(0)
+    moved = subject
+    for attempt in range(PERTURB_TRIES):
+        if not is_degenerate(polygon_edges(moved), grid, DEGENERATE_EPS * scale):
+            break
+        offset = rng.uniform(-1.0, 1.0, (len(subject), 2)) * PERTURB_SCALE * scale * (attempt + 1)
+        moved = [tuple(p) for p in (np.asarray(subject) + offset).tolist()]
+    return moved, find_intersections(moved, clip, grid)
+
+def edge_positions(p1, p2, points):
+    axis = (np.abs(p2[:, 1] - p1[:, 1]) > np.abs(p2[:, 0] - p1[:, 0])).astype(np.int64)
+    rows = np.arange(len(points))
+    return (points[rows, axis] - p1[rows, axis]) / (p2[rows, axis] - p1[rows, axis])
+
+def snap_points(subject, moved, clip, intersections):
+    n, m = len(subject), len(clip)
+    edges = np.array([item['subject_edge'][0] for item in intersections], dtype=np.int64)
+    clip_edges = np.array([item['clip_edge'][0] for item in intersections], dtype=np.int64)
+    xy = np.array([item['point'] for item in intersections], dtype=np.float64).reshape(-1, 2)
+    moved = np.asarray(moved, dtype=np.float64)
+    original = np.asarray(subject, dtype=np.float64)
+    clip = np.asarray(clip, dtype=np.float64)
+    p1, p2 = original[edges], original[(edges + 1) % n]
+    q1, q2 = clip[clip_edges], clip[(clip_edges + 1) % m]
+    d, e = p2 - p1, q2 - q1
+    den = d[:, 0] * e[:, 1] - d[:, 1] * e[:, 0]
+    crossing = np.abs(den) > DEGENERATE_EPS * np.hypot(*d.T) * np.hypot(*e.T)
+    t = edge_positions(moved[edges], moved[(edges + 1) % n], xy)
+    w = q1 - p1
+    t[crossing] = ((w[:, 0] * e[:, 1] - w[:, 1] * e[:, 0])[crossing] / den[crossing])
+    return [tuple(p) for p in (p1 + t[:, None] * d).tolist()]
+
+def drop_redundant(ring, tolerance):
+    pts = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+    while len(pts) >= 3:
+        prev, nxt = np.roll(pts, 1, axis=0), np.roll(pts, -1, axis=0)
+        keep = np.hypot(*(nxt - pts).T) > tolerance
+        if keep.all():
+            d = nxt - prev
+            length = np.hypot(d[:, 0], d[:, 1])
+            cross = np.abs((pts[:, 0] - prev[:, 0]) * d[:, 1] - (pts[:, 1] - prev[:, 1]) * d[:, 0])
+            keep = (length > tolerance) & (cross > tolerance * length)
+            if keep.all():
+                return [tuple(p) for p in pts.tolist()]
+        pts = pts[keep]
+    return []
+
+def nested_result(subject, clip, operation, subject_xy, clip_xy):
+    subject_in = inside(subject_xy[0], clip_xy)
+    clip_in = inside(clip_xy[0], subject_xy)
+    if operation == "intersection":
+        return [(subject, [])] if subject_in else [(clip, [])] if clip_in else []
+    if operation == "union":
+        return [(clip, [])] if subject_in else [(subject, [])] if clip_in else [(subject, []), (clip, [])]
+    if subject_in:
+        return []
+    return [(subject, [clip[::-1]])] if clip_in else [(subject, [])]
+
+class RingWalk:
+    def __init__(self, ring, geometry, edges, points, start_inside, invert):
+        self.n = len(ring)
+        self.doubled = list(ring) + list(ring)
+        pts = np.asarray(geometry, dtype=np.float64)
+        position = edge_positions(pts[edges], pts[(edges + 1) % self.n], points)
+        rows = np.arange(len(edges))
+        order = np.lexsort((position, edges))
+        rank = np.empty_like(order)
+        rank[order] = rows
+        self.order = order.tolist()
+        self.rank = rank.tolist()
+        self.edges = edges.tolist()
+        self.entry = (((rank % 2) == 1) == start_inside) != invert
+        self.entry = self.entry.tolist()
+
+    def step(self, q, forward):
+        k = len(self.order)
+        r = self.rank[q]
+        e = self.edges[q]
+        n = self.n
+        if forward:
+            nxt = self.order[(r + 1) % k]
+            count = (self.edges[nxt] - e) % n
+            if count == 0 and r == k - 1:
+                count = n
+            start = (e + 1) % n
+            return self.doubled[start:start + count], nxt
+        nxt = self.order[r - 1]
+        count = (e - self.edges[nxt]) % n
+        if count == 0 and r == 0:
+            count = n
+        return self.doubled[e + n:e + n - count:-1], nxt
+
+def trace_rings(subject_walk, clip_walk, points):
+    rings = []
+    visited = [False] * len(points)
+    for start in subject_walk.order:
+        if visited[start] or not subject_walk.entry[start]:
+            continue
+        ring = []
+        q, walk, other = start, subject_walk, clip_walk
+        while True:
+            visited[q] = True
+            ring.append(points[q])
+            run, q = walk.step(q, walk.entry[q])
+            ring.extend(run)
+            walk, other = other, walk
+            if visited[q]:
+                break
+        if len(ring) >= 3:
+            rings.append(ring)
+    return rings
+
+def assign_holes(rings):
+    outers = sorted((item for item in rings if item[1] > 0), key=lambda item: item[1])
+    holes = [ring for ring, area in rings if area <= 0]
+    result = [(outer, []) for outer, area in outers]
+    for hole in holes:
+        for outer, outer_holes in result:
+            if inside(hole[0], outer):
+                outer_holes.append(hole)
+                break
+    return result
+
+class LiveClip:
+    def __init__(self, subject=(), clip=(), operation="intersection"):
+        self.subject = [tuple(p) for p in subject]
+        self.clip = [tuple(p) for p in clip]
+        self.subject_xy = np.asarray(self.subject, dtype=np.float64).reshape(-1, 2)
+        self.clip_xy = np.asarray(self.clip, dtype=np.float64).reshape(-1, 2)
+        self.operation = operation
+        self.intersections = find_intersections(self.subject, self.clip)
+        self.touches = set()
+        if len(self.subject) and len(self.clip):
+            edges = polygon_edges(self.subject_xy)
+            grid = EdgeGrid(polygon_edges(self.clip_xy))
+            i, j = grid.candidates(edges)
+            touch = touching(edges, grid.edges, i, j, DEGENERATE_EPS * extent(self.subject_xy, self.clip_xy))
+            self.touches = set(zip(i[touch].tolist(), j[touch].tolist()))
+        self.result = self.refresh()
+
+    def append(self, point, is_subject=True):
+        ring, other = (self.subject, self.clip) if is_subject else (self.clip, self.subject)
+        key, other_key = ("subject_edge", "clip_edge") if is_subject else ("clip_edge", "subject_edge")
+        n = len(ring)
+        closing = n - 1
+        self.intersections = [item for item in self.intersections if item[key][0] != closing]
+        self.touches = {pair for pair in self.touches if pair[0 if is_subject else 1] != closing}
+        ring.append(tuple(point))
+        xy = np.concatenate((self.subject_xy if is_subject else self.clip_xy, [ring[n]]))
+        other_xy = self.clip_xy if is_subject else self.subject_xy
+        if is_subject:
+            self.subject_xy = xy
+        else:
+            self.clip_xy = xy
+        if n and other:
+            new_edges = np.hstack((xy[[n - 1, n]], xy[[n, 0]]))
+            other_edges = polygon_edges(other_xy)
+            m = len(other)
+            tolerance = DEGENERATE_EPS * extent(xy, other_xy)
+            i, j = bbox_pairs(new_edges, other_edges, tolerance)
+            touch = touching(new_edges, other_edges, i, j, tolerance)
+            for a, b in zip(i[touch].tolist(), j[touch].tolist()):
+                self.touches.add((n - 1 + a, b) if is_subject else (b, n - 1 + a))
+            i, j, xs, ys = edge_intersections(new_edges, other_edges, i, j)
+            for a, b, x, y in zip(i.tolist(), j.tolist(), xs.tolist(), ys.tolist()):
+                start = n - 1 + a
+                self.intersections.append({
+                    'point': (x, y),
+                    key: (start, (start + 1) % (n + 1)),
+                    other_key: (b, (b + 1) % m)
+                })
+        self.result = self.refresh()
+        return self.result
+
+    def set_operation(self, operation):
+        self.operation = operation
+        self.result = self.refresh()
+        return self.result
+
+    def refresh(self):
+        if len(self.subject) < 3 or len(self.clip) < 3 or self.touches:
+            return polygon_boolean(self.subject, self.clip, self.operation)
+        subject, subject_xy, intersections = oriented(self.subject, self.subject_xy,
+                                                      self.intersections, "subject_edge")
+        clip, clip_xy, intersections = oriented(self.clip, self.clip_xy, intersections, "clip_edge")
+        scale = extent(subject_xy, clip_xy)
+        if self.operation == "xor":
+            swapped = [{'point': item['point'], 'subject_edge': item['clip_edge'],
+                        'clip_edge': item['subject_edge']} for item in intersections]
+            return (combine(subject, clip, intersections, "difference", scale, subject_xy, clip_xy) +
+                    combine(clip, subject, swapped, "difference", scale, clip_xy, subject_xy))
+        return combine(subject, clip, intersections, self.operation, scale, subject_xy, clip_xy)
+
+def bbox_pairs(edges_a, edges_b, tolerance):
+    lo_a = np.minimum(edges_a[:, :2], edges_a[:, 2:]) - tolerance
+    hi_a = np.maximum(edges_a[:, :2], edges_a[:, 2:]) + tolerance
+    lo_b = np.minimum(edges_b[:, :2], edges_b[:, 2:])
+    hi_b = np.maximum(edges_b[:, :2], edges_b[:, 2:])
+    overlap = np.all((lo_a[:, None] <= hi_b[None]) & (hi_a[:, None] >= lo_b[None]), axis=2)
+    return np.nonzero(overlap)
+
+def oriented(ring, xy, intersections, key):
+    if signed_area(xy) >= 0:
+        return ring, xy, intersections
+    n = len(ring)
+    remapped = []
+    for item in intersections:
+        edge = (n - 2 - item[key][0]) % n
+        item = dict(item)
+        item[key] = (edge, (edge + 1) % n)
+        remapped.append(item)
+    return ring[::-1], xy[::-1], remapped
@@ -0,0 +1,331 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from predicates import orient2d_array
+
+CHUNK_PAIRS = 1 << 22
+STREAM_LIMIT = 64
+SLAB_EPS = 1e-9
+SLAB_GAIN = 4
+worker_clipper = None
+
+class Clipper:
+    def __init__(self, clip_poly):
+        self.polygon = [tuple(p) for p in clip_poly]
+        self.edges = polygon_edges(self.polygon)
+        self.grid = EdgeGrid(self.edges)
+        self.locator = SlabLocator(self.polygon)
+        self.lo = self.grid.lo.min(axis=0)
+        self.hi = self.grid.hi.max(axis=0)
+        x1, y1, x2, y2 = self.edges.T
+        self.area = 0.5 * float(np.sum(x1 * y2 - x2 * y1))
+        self.orientation = 1 if self.area > 0 else -1
+        self.convex = is_convex(self.polygon)
+
+    def clip(self, subject_poly):
+        if len(subject_poly) < 3:
+            return []
+        pts = np.asarray(subject_poly, dtype=np.float64)
+        if np.any(pts.max(axis=0) < self.lo) or np.any(pts.min(axis=0) > self.hi):
+            return []
+        from booleans import counter_clockwise, polygon_boolean
+        if self.convex and is_convex(subject_poly):
+            ring = sutherland_hodgman(subject_poly, self.edges, self.orientation)
+            return [(counter_clockwise(ring), [])] if ring else []
+        return polygon_boolean(subject_poly, self.polygon, "intersection", self.grid)
+
+    def contains(self, points, rule="evenodd"):
+        return self.locator.contains(points, rule)
+
+    def clip_many(self, subjects, workers=1, chunksize=64):
+        if workers <= 1:
+            return [self.clip(subject) for subject in subjects]
+        with ProcessPoolExecutor(workers, initializer=attach_clipper, initargs=(self.polygon,)) as pool:
+            return list(pool.map(clip_worker, subjects, chunksize=chunksize))
+
+def attach_clipper(clip_poly):
+    global worker_clipper
+    worker_clipper = Clipper(clip_poly)
+
+def clip_worker(subject_poly):
+    return worker_clipper.clip(subject_poly)
+
+def is_convex(polygon):
+    pts = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    d = np.roll(pts, -1, axis=0) - pts
+    d = d[np.any(d != 0, axis=1)]
+    if len(d) < 3:
+        return False
+    e = np.roll(d, -1, axis=0)
+    cross = d[:, 0]*e[:, 1] - d[:, 1]*e[:, 0]
+    dot = d[:, 0]*e[:, 0] + d[:, 1]*e[:, 1]
+    corners = pts[np.any(np.roll(pts, -1, axis=0) != pts, axis=1)]
+    turns = orient2d_array(corners, np.roll(corners, -1, axis=0), np.roll(corners, -2, axis=0))
+    if np.any(turns > 0) and np.any(turns < 0):
+        return False
+    turn = np.arctan2(cross, dot).sum()
+    return abs(abs(turn) - 2*np.pi) < 1e-6
+
+def clip_edge(points, a, b, orientation):
+    side = orientation*((b[0] - a[0])*(points[:, 1] - a[1]) - (b[1] - a[1])*(points[:, 0] - a[0]))
+    inside = side >= 0
+    if inside.all():
+        return points
+    if not inside.any():
+        return points[:0]
+    cur = np.roll(points, -1, axis=0)
+    cur_side = np.roll(side, -1)
+    cur_inside = np.roll(inside, -1)
+    crossing = inside != cur_inside
+    t = np.divide(side, side - cur_side, out=np.zeros_like(side), where=crossing)
+    cut = points + t[:, None]*(cur - points)
+    out = np.stack((cut, cur), axis=1)
+    return out[np.stack((crossing, cur_inside), axis=1)]
+
+def clip_stream(points, a, b, orientation):
+    ax, ay = a
+    dx, dy = b[0] - ax, b[1] - ay
+    first = prev = first_side = prev_side = None
+    for point in points:
+        side = orientation*(dx*(point[1] - ay) - dy*(point[0] - ax))
+        if prev is None:
+            first, first_side = point, side
+        else:
+            yield from clip_step(prev, prev_side, point, side)
+        prev, prev_side = point, side
+    if prev is not None:
+        yield from clip_step(prev, prev_side, first, first_side)
+
+def clip_step(prev, prev_side, point, side):
+    if (prev_side >= 0) != (side >= 0):
+        t = prev_side / (prev_side - side)
+        yield (prev[0] + t*(point[0] - prev[0]), prev[1] + t*(point[1] - prev[1]))
+    if side >= 0:
+        yield point
+
+def clip_stages(points, clip_edges, orientation):
+    for a_x, a_y, b_x, b_y in clip_edges.tolist():
+        if isinstance(points, np.ndarray):
+            points = clip_edge(points, (a_x, a_y), (b_x, b_y), orientation)
+        else:
+            points = clip_stream(points, (a_x, a_y), (b_x, b_y), orientation)
+        yield points
+
+def sutherland_hodgman(subject, clip_edges, orientation):
+    if len(subject) >= STREAM_LIMIT:
+        subject = np.asarray(subject, dtype=np.float64).reshape(-1, 2)
+    for points in clip_stages(subject, clip_edges, orientation):
+        pass
+    if isinstance(points, np.ndarray):
+        points = [tuple(p) for p in points.tolist()]
+    else:
+        points = list(points)
+    if len(points) < 3:
+        return []
+    return points
+
+def polygon_edges(polygon):
+    pts = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    return np.hstack((pts, np.roll(pts, -1, axis=0)))
+
+class EdgeGrid:
+    def __init__(self, edges, cells=None):
+        self.edges = edges
+        m = len(edges)
+        self.lo = np.minimum(edges[:, :2], edges[:, 2:])
+        self.hi = np.maximum(edges[:, :2], edges[:, 2:])
+        self.origin = self.lo.min(axis=0) if m else np.zeros(2)
+        extent = (self.hi.max(axis=0) - self.origin) if m else np.ones(2)
+        extent = np.maximum(extent, 1e-12)
+        if cells is None:
+            cells = max(1, int(np.sqrt(m)))
+        self.shape = np.array([cells, cells])
+        self.cell = extent / cells
+        cx0, cy0, cx1, cy1 = self.cell_range(self.lo, self.hi)
+        owner, cell_ids = self.expand(cx0, cy0, cx1, cy1)
+        order = np.argsort(cell_ids, kind="stable")
+        self.items = owner[order]
+        self.starts = np.searchsorted(cell_ids[order], np.arange(cells * cells + 1))
+
+    def cell_range(self, lo, hi):
+        c0 = np.floor((lo - self.origin) / self.cell).astype(np.int64)
+        c1 = np.floor((hi - self.origin) / self.cell).astype(np.int64)
+        c0 = np.clip(c0, 0, self.shape - 1)
+        c1 = np.clip(c1, 0, self.shape - 1)
+        return c0[:, 0], c0[:, 1], c1[:, 0], c1[:, 1]
+
+    def expand(self, cx0, cy0, cx1, cy1):
+        w = cx1 - cx0 + 1
+        counts = w * (cy1 - cy0 + 1)
+        owner = np.repeat(np.arange(len(cx0)), counts)
+        k = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = cx0[owner] + k % w[owner]
+        cy = cy0[owner] + k // w[owner]
+        return owner, cy * self.shape[0] + cx
+
+    def candidates(self, edges):
+        if len(edges) == 0 or len(self.edges) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        lo = np.minimum(edges[:, :2], edges[:, 2:])
+        hi = np.maximum(edges[:, :2], edges[:, 2:])
+        top = self.hi.max(axis=0)
+        inside = np.all((hi >= self.origin) & (lo <= top), axis=1)
+        index = np.flatnonzero(inside)
+        owner, cell_ids = self.expand(*self.cell_range(lo[index], hi[index]))
+        first = self.starts[cell_ids]
+        counts = self.starts[cell_ids + 1] - first
+        pair_owner = np.repeat(index[owner], counts)
+        k = np.arange(len(pair_owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        other = self.items[np.repeat(first, counts) + k]
+        overlap = np.all((lo[pair_owner] <= self.hi[other]) & (hi[pair_owner] >= self.lo[other]), axis=1)
+        pair_owner, other = pair_owner[overlap], other[overlap]
+        keys = np.unique(pair_owner * len(self.edges) + other)
+        return keys // len(self.edges), keys % len(self.edges)
+
+def edge_intersections(edges_a, edges_b, i, j):
+    a0, a1 = edges_a[i, :2], edges_a[i, 2:]
+    b0, b1 = edges_b[j, :2], edges_b[j, 2:]
+    s0 = orient2d_array(b0, b1, a0)
+    s1 = orient2d_array(b0, b1, a1)
+    s2 = orient2d_array(a0, a1, b0)
+    s3 = orient2d_array(a0, a1, b1)
+    ok = ((s0 != 0) | (s1 != 0)) & (s0*s1 <= 0) & (s2*s3 <= 0)
+    i, j = i[ok], j[ok]
+    x1, y1, x2, y2 = edges_a[i].T
+    x3, y3, x4, y4 = edges_b[j].T
+    den = (x1 - x2)*(y3 - y4) - (y1 - y2)*(x3 - x4)
+    num = (x1 - x3)*(y3 - y4) - (y1 - y3)*(x3 - x4)
+    t = np.divide(num, den, out=np.select([s0[ok] == 0, s1[ok] == 0], [0.0, 1.0], 0.5), where=den != 0)
+    t = np.clip(t, 0.0, 1.0)
+    x = x1 + t*(x2 - x1)
+    y = y1 + t*(y2 - y1)
+    return i, j, x, y
+
+def find_intersections(subject, clip, grid=None):
+    subject_edges = polygon_edges(subject)
+    if grid is None:
+        grid = EdgeGrid(polygon_edges(clip))
+    i, j = grid.candidates(subject_edges)
+    i, j, xs, ys = edge_intersections(subject_edges, grid.edges, i, j)
+    n, m = len(subject), len(clip)
+    intersections = []
+    for a, b, x, y in zip(i.tolist(), j.tolist(), xs.tolist(), ys.tolist()):
+        intersections.append({
+            'point': (x, y),
+            'subject_edge': (a, (a+1)%n),
+            'clip_edge': (b, (b+1)%m)
+        })
+    return intersections
+
+def crossing_edges(polygon):
+    pts = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    p, q = pts, np.roll(pts, -1, axis=0)
+    keep = p[:, 1] != q[:, 1]
+    p, q = p[keep], q[keep]
+    ymin = np.minimum(p[:, 1], q[:, 1])
+    ymax = np.maximum(p[:, 1], q[:, 1])
+    direction = np.where(q[:, 1] > p[:, 1], 1, -1)
+    return p, q, ymin, ymax, direction
+
+def count_crossings(xs, ys, point_index, p, q, edge_index, direction, counts, rule):
+    e = edge_index
+    xinters = (ys[point_index] - p[e, 1])*(q[e, 0] - p[e, 0])/(q[e, 1] - p[e, 1]) + p[e, 0]
+    hit = xs[point_index] <= xinters
+    weights = np.ones(len(e)) if rule == "evenodd" else direction[e]
+    counts += np.bincount(point_index[hit], weights[hit], minlength=len(counts)).astype(np.int64)
+
+def inside_from_counts(counts, rule):
+    if rule == "evenodd":
+        return (counts & 1).astype(bool)
+    if rule == "nonzero":
+        return counts != 0
+    raise ValueError(f"Неизвестное правило: {rule}")
+
+def points_in_polygon(points, polygon, rule="evenodd"):
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    counts = np.zeros(len(pts), dtype=np.int64)
+    if len(polygon) < 3:
+        return inside_from_counts(counts, rule)
+    p, q, ymin, ymax, direction = crossing_edges(polygon)
+    order = np.argsort(pts[:, 1], kind="stable")
+    sorted_y = pts[order, 1]
+    first = np.searchsorted(sorted_y, ymin, side="right")
+    last = np.searchsorted(sorted_y, ymax, side="right")
+    sizes = last - first
+    if sizes.sum() > SLAB_GAIN * slab_pairs(ymin, ymax):
+        return SlabLocator(polygon).contains(pts, rule)
+    ends = np.cumsum(sizes)
+    start = 0
+    while start < len(sizes):
+        limit = (ends[start - 1] if start else 0) + CHUNK_PAIRS
+        stop = max(int(np.searchsorted(ends, limit, side="right")), start + 1)
+        part = sizes[start:stop]
+        edge_index = np.repeat(np.arange(start, stop), part)
+        k = np.arange(len(edge_index)) - np.repeat(np.cumsum(part) - part, part)
+        point_index = order[np.repeat(first[start:stop], part) + k]
+        count_crossings(pts[:, 0], pts[:, 1], point_index, p, q, edge_index, direction, counts, rule)
+        start = stop
+    return inside_from_counts(counts, rule)
+
+def slab_pairs(ymin, ymax):
+    ys = np.unique(np.concatenate((ymin, ymax)))
+    return int(np.sum(np.searchsorted(ys, ymax) - np.searchsorted(ys, ymin)))
+
+class SlabLocator:
+    def __init__(self, polygon):
+        self.size = len(polygon)
+        self.p, self.q, ymin, ymax, self.direction = crossing_edges(polygon)
+        self.slope = (self.q[:, 0] - self.p[:, 0]) / (self.q[:, 1] - self.p[:, 1])
+        self.ys = np.unique(np.concatenate((ymin, ymax)))
+        lo = np.searchsorted(self.ys, ymin)
+        hi = np.searchsorted(self.ys, ymax)
+        spans = hi - lo
+        edge = np.repeat(np.arange(len(lo)), spans)
+        slab = lo[edge] + np.arange(len(edge)) - np.repeat(np.cumsum(spans) - spans, spans)
+        x0 = self.x_at(edge, self.ys[slab])
+        x1 = self.x_at(edge, self.ys[slab + 1])
+        order = np.lexsort((x0 + x1, slab))
+        slab, x0, x1 = slab[order], x0[order], x1[order]
+        same = slab[1:] == slab[:-1]
+        tolerance = SLAB_EPS * (np.ptp(np.concatenate((self.p, self.q))) if len(self.p) else 0)
+        self.sorted = not np.any(same & ((x0[1:] < x0[:-1] - tolerance) | (x1[1:] < x1[:-1] - tolerance)))
+        self.items = edge[order]
+        self.winding = np.concatenate(([0], np.cumsum(self.direction[self.items])))
+        self.starts = np.searchsorted(slab, np.arange(max(len(self.ys) - 1, 0) + 1))
+        self.depth = int(np.diff(self.starts).max(initial=0)).bit_length()
+
+    def x_at(self, edge, y):
+        return (y - self.p[edge, 1])*self.slope[edge] + self.p[edge, 0]
+
+    def contains(self, points, rule="evenodd"):
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        counts = np.zeros(len(pts), dtype=np.int64)
+        if self.size < 3 or len(self.ys) < 2:
+            return inside_from_counts(counts, rule)
+        slab = np.searchsorted(self.ys, pts[:, 1], side="left") - 1
+        index = np.flatnonzero((slab >= 0) & (slab < len(self.ys) - 1))
+        if self.sorted:
+            self.count_sorted(pts[index], slab[index], index, counts, rule)
+            return inside_from_counts(counts, rule)
+        for chunk in range(0, len(index), CHUNK_PAIRS // 4):
+            point_index = index[chunk:chunk + CHUNK_PAIRS // 4]
+            first = self.starts[slab[point_index]]
+            sizes = self.starts[slab[point_index] + 1] - first
+            k = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            edge_index = self.items[np.repeat(first, sizes) + k]
+            point_index = np.repeat(point_index, sizes)
+            count_crossings(pts[:, 0], pts[:, 1], point_index, self.p, self.q, edge_index,
+                            self.direction, counts, rule)
+        return inside_from_counts(counts, rule)
+
+    def count_sorted(self, pts, slab, index, counts, rule):
+        lo = self.starts[slab]
+        hi = last = self.starts[slab + 1]
+        for _ in range(self.depth):
+            mid = (lo + hi) // 2
+            active = lo < hi
+            edge = self.items[np.minimum(mid, len(self.items) - 1)]
+            right = pts[:, 0] <= self.x_at(edge, pts[:, 1])
+            hi = np.where(active & right, mid, hi)
+            lo = np.where(active & ~right, mid + 1, lo)
+        counts[index] = last - lo if rule == "evenodd" else self.winding[last] - self.winding[lo]
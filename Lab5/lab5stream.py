@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from booleans import OPERATIONS, polygon_boolean, counter_clockwise
+from clipper import Clipper
+
+NUMBER_PAIR = re.compile(r"([-+0-9.eE]+)\s+([-+0-9.eE]+)")
+worker_clip = None
+
+def parse_wkt(text):
+    text = text.strip()
+    if not text.upper().startswith("POLYGON"):
+        raise ValueError(f"Ожидался POLYGON: {text[:40]}")
+    body = text[text.index("(") + 1:text.rindex(")")]
+    exterior = body[body.index("(") + 1:body.index(")")]
+    if "(" in body[body.index(")"):]:
+        raise ValueError("Многоугольники с дырами не поддерживаются")
+    points = [(float(x), float(y)) for x, y in NUMBER_PAIR.findall(exterior)]
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    return points
+
+def parse_polygon(text):
+    text = text.strip()
+    if text[:1] in "[{":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            if "polygon" not in data:
+                raise ValueError("В записи нет поля polygon")
+            data = data["polygon"]
+        return [(float(x), float(y)) for x, y in data]
+    return parse_wkt(text)
+
+def format_wkt(result):
+    if not result:
+        return "MULTIPOLYGON EMPTY"
+    polygons = []
+    for outer, holes in result:
+        rings = ["(" + ", ".join(f"{x!r} {y!r}" for x, y in ring + ring[:1]) + ")" for ring in [outer] + holes]
+        polygons.append("(" + ", ".join(rings) + ")")
+    return "MULTIPOLYGON (" + ", ".join(polygons) + ")"
+
+def format_json(result):
+    return json.dumps([[[list(p) for p in ring] for ring in [outer] + holes] for outer, holes in result])
+
+FORMATS = {"json": format_json, "wkt": format_wkt}
+
+def attach_clip(clip, operation, output):
+    global worker_clip
+    worker_clip = (Clipper(counter_clockwise(clip)), operation, output)
+
+def clip_polygon(subject, clipper, operation):
+    if operation == "intersection":
+        return clipper.clip(subject)
+    return polygon_boolean(subject, clipper.polygon, operation, clipper.grid)
+
+def clip_lines(lines):
+    clipper, operation, output = worker_clip
+    results = []
+    for number, line in lines:
+        try:
+            results.append((number, FORMATS[output](clip_polygon(parse_polygon(line), clipper, operation)), None))
+        except Exception as error:
+            results.append((number, None, f"{type(error).__name__}: {error}"))
+    return results
+
+def read_chunks(stream, size):
+    lines = ((number, line) for number, line in enumerate(stream, 1)
+             if line.strip() and not line.lstrip().startswith("#"))
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def run(chunks, clip, operation="intersection", output="json", workers=1):
+    if workers <= 1:
+        attach_clip(clip, operation, output)
+        for chunk in chunks:
+            yield from clip_lines(chunk)
+        return
+    with ProcessPoolExecutor(workers, initializer=attach_clip, initargs=(clip, operation, output)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(clip_lines, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковое отсечение многоугольников из файла")
+    parser.add_argument("input", nargs="?", default="-", help="файл JSON Lines/WKT или - для stdin")
+    parser.add_argument("--clip", required=True, help="отсекающий многоугольник (JSON, WKT или путь к файлу)")
+    parser.add_argument("--op", choices=OPERATIONS, default="intersection")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="json")
+    parser.add_argument("--output", default="-", help="файл результата или - для stdout")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk", type=int, default=64)
+    args = parser.parse_args()
+    text = args.clip
+    if os.path.exists(text):
+        with open(text, encoding="utf-8") as f:
+            text = f.read()
+    clip = parse_polygon(text)
+    if len(clip) < 3:
+        parser.error("отсекающий многоугольник должен иметь не менее 3 вершин")
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = errors = 0
+    with stream, out:
+        for number, line, error in run(read_chunks(stream, args.chunk), clip, args.op, args.format, args.workers):
+            if error is not None:
+                errors += 1
+                print(f"Строка {number}: {error}", file=sys.stderr)
+                if args.format == "json":
+                    out.write(json.dumps({"line": number, "error": error}, ensure_ascii=False) + "\n")
+                else:
+                    out.write(format_wkt([]) + "\n")
+                continue
+            out.write(line + "\n")
+            count += 1
+    print(f"Обработано многоугольников: {count}, ошибок: {errors}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
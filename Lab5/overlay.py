@@ -0,0 +1,58 @@
+from OpenGL.GL import *
+import numpy as np
+
+class PolygonBuffer:
+    def __init__(self):
+        self.vbo = glGenBuffers(1)
+        self.rings = []
+        self.lengths = []
+        self.capacity = 0
+        self.total = 0
+        self.firsts = np.zeros(0, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.int32)
+        self.uploads = 0
+
+    def update(self, rings):
+        rings = [ring for ring in rings if ring]
+        same = len(rings) == len(self.rings) and all(a is b for a, b in zip(rings, self.rings))
+        lengths = [len(ring) for ring in rings]
+        if same and lengths == self.lengths:
+            return False
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        total = sum(lengths)
+        if same and len(rings) == 1 and self.total < total <= self.capacity:
+            tail = np.asarray(rings[0][self.total:], dtype=np.float32)
+            glBufferSubData(GL_ARRAY_BUFFER, self.total * 8, tail.nbytes, tail)
+        else:
+            data = np.asarray([p for ring in rings for p in ring], dtype=np.float32).reshape(-1, 2)
+            self.capacity = max(total * 2, 64)
+            glBufferData(GL_ARRAY_BUFFER, self.capacity * 8, None, GL_DYNAMIC_DRAW)
+            if total:
+                glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.rings = rings
+        self.lengths = lengths
+        self.total = total
+        self.counts = np.array(lengths, dtype=np.int32)
+        self.firsts = (np.cumsum(self.counts) - self.counts).astype(np.int32)
+        self.uploads += 1
+        return True
+
+    def draw(self, color, point_size=5.0):
+        if not self.total:
+            return
+        glColor3f(*color)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, None)
+        if len(self.counts) == 1:
+            glDrawArrays(GL_LINE_LOOP, 0, self.total)
+        else:
+            glMultiDrawArrays(GL_LINE_LOOP, self.firsts, self.counts, len(self.counts))
+        glPointSize(point_size)
+        glDrawArrays(GL_POINTS, 0, self.total)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        glDeleteBuffers(1, [self.vbo])
@@ -0,0 +1,25 @@
+from fractions import Fraction
+import numpy as np
+
+EPSILON = 2.0 ** -53
+ORIENT_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+
+def orient2d_exact(a, b, c):
+    ax, ay = Fraction(a[0]), Fraction(a[1])
+    bx, by = Fraction(b[0]), Fraction(b[1])
+    cx, cy = Fraction(c[0]), Fraction(c[1])
+    det = (ax - cx)*(by - cy) - (ay - cy)*(bx - cx)
+    return (det > 0) - (det < 0)
+
+def orient2d_array(a, b, c):
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 2)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 2)
+    c = np.asarray(c, dtype=np.float64).reshape(-1, 2)
+    a, b, c = np.broadcast_arrays(a, b, c)
+    left = (a[:, 0] - c[:, 0])*(b[:, 1] - c[:, 1])
+    right = (a[:, 1] - c[:, 1])*(b[:, 0] - c[:, 0])
+    det = left - right
+    sign = np.sign(det).astype(np.int8)
+    for k in np.flatnonzero(np.abs(det) <= ORIENT_BOUND*(np.abs(left) + np.abs(right))).tolist():
+        sign[k] = orient2d_exact(a[k], b[k], c[k])
+    return sign
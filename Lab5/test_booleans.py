@@ -0,0 +1,16 @@
+import math
+from bench_clip import star_polygon
+from booleans import LiveClip, polygon_boolean, signed_area
+from clipper import polygon_edges, sutherland_hodgman
+
+
+def total_area(result):
+    return sum(signed_area(outer) + sum(signed_area(hole) for hole in holes) for outer, holes in result)
+
+
+def test_near_vertical_clip_edge_keeps_intersections_in_order():
+    clip = [(math.cos(2 * math.pi * i / 7) * 1.2 + 0.1, math.sin(2 * math.pi * i / 7) * 1.2) for i in range(7)]
+    subject = star_polygon(89, 0, 0, 1.2, seed=97)
+    expected = abs(signed_area(sutherland_hodgman(subject, polygon_edges(clip), 1)))
+    assert abs(total_area(polygon_boolean(subject, clip, "intersection")) - expected) < 1e-9
+    assert abs(total_area(LiveClip(subject, clip).result) - expected) < 1e-9
@@ -1,7 +1,11 @@
+import os
+import sys
 import glfw
 from OpenGL.GL import *
 from OpenGL.GLU import *
-import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from mesh import uv_sphere
 
 angle_x, angle_y, angle_z = 0.0, 0.0, 0.0
 size = 1.0
@@ -149,53 +153,18 @@ def draw_bounding_box():
     glPopMatrix()
 
 def draw_sphere(sectors, stacks):
-    radius = 1.0
-    for i in range(stacks):
-        theta1 = i * math.pi / stacks
-        theta2 = (i + 1) * math.pi / stacks
-        for j in range(sectors):
-            phi1 = j * 2 * math.pi / sectors
-            phi2 = (j + 1) * 2 * math.pi / sectors
-            p1 = spherical_to_cartesian(radius, theta1, phi1)
-            p2 = spherical_to_cartesian(radius, theta2, phi1)
-            p3 = spherical_to_cartesian(radius, theta2, phi2)
-            p4 = spherical_to_cartesian(radius, theta1, phi2)
-            n1 = spherical_to_cartesian(1.0, theta1, phi1)
-            n2 = spherical_to_cartesian(1.0, theta2, phi1)
-            n3 = spherical_to_cartesian(1.0, theta2, phi2)
-            n4 = spherical_to_cartesian(1.0, theta1, phi2)
-            glBegin(GL_TRIANGLES)
-            if texture_enabled:
-                glTexCoord2f(j/sectors, i/stacks)
-            glNormal3fv(n1)
-            glVertex3fv(p1)
-            if texture_enabled:
-                glTexCoord2f(j/sectors, (i+1)/stacks)
-            glNormal3fv(n2)
-            glVertex3fv(p2)
-            if texture_enabled:
-                glTexCoord2f((j+1)/sectors, (i+1)/stacks)
-            glNormal3fv(n3)
-            glVertex3fv(p3)
-            if texture_enabled:
-                glTexCoord2f(j/sectors, i/stacks)
-            glNormal3fv(n1)
-            glVertex3fv(p1)  
-            if texture_enabled:
-                glTexCoord2f((j+1)/sectors, (i+1)/stacks)
-            glNormal3fv(n3)
-            glVertex3fv(p3)
-            if texture_enabled:
-                glTexCoord2f((j+1)/sectors, i/stacks)
-            glNormal3fv(n4)
-            glVertex3fv(p4)
-            glEnd()
-
-def spherical_to_cartesian(r, theta, phi):
-    x = r * math.sin(theta) * math.cos(phi)
-    y = r * math.sin(theta) * math.sin(phi)
-    z = r * math.cos(theta)
-    return (x, y, z)
+    positions, normals, uvs, indices = uv_sphere(sectors, stacks)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_NORMAL_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, positions)
+    glNormalPointer(GL_FLOAT, 0, normals)
+    if texture_enabled:
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glTexCoordPointer(2, GL_FLOAT, 0, uvs)
+    glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, indices)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glDisableClientState(GL_NORMAL_ARRAY)
+    glDisableClientState(GL_TEXTURE_COORD_ARRAY)
 
 def update_position():
     global position, velocity
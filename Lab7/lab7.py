@@ -1,7 +1,16 @@
+import ctypes
+import os
+import sys
 import glfw
 from OpenGL.GL import *
 from OpenGL.GLU import *
-import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from mesh import uv_sphere, interleave
+from meshcache import GpuMesh, MeshCache
+from meshbuilder import MeshBuilder
+
+MESH_BUDGET = 64 << 20
 
 angle_x, angle_y, angle_z = 0.0, 0.0, 0.0
 size = 1.0
@@ -14,15 +23,13 @@ position = [0.0, 0.0, 0.0]
 velocity = [0.03, 0.05, 0.02] 
 box_size = 4.0 
 texture_id = 0
-sphere_list = None
-vbo_vertices = None
-vbo_normals = None
-vbo_texcoords = None
-index_count = 0
+mesh_cache = None
+mesh_builder = None
+sphere_mesh = None
 last_frame_time = 0.0
 
 def main():
-    global texture_id, sphere_list, vbo_vertices, vbo_normals, vbo_texcoords, index_count, last_frame_time
+    global texture_id, mesh_cache, mesh_builder, sphere_mesh, last_frame_time
     if not glfw.init():
         return
     window = glfw.create_window(640, 640, "Lab7", None, None)
@@ -39,11 +46,14 @@ def main():
     glEnable(GL_NORMALIZE)
     texture_id = generate_checkerboard_texture()
     setup_lighting()
-    sphere_list, vbo_vertices, vbo_normals, vbo_texcoords, index_count = create_sphere_vbo(sectors, stacks)
+    mesh_cache = MeshCache({"sphere": create_sphere_vbo}, MESH_BUDGET)
+    mesh_builder = MeshBuilder(mesh_cache, {"sphere": sphere_arrays}, {"sphere": upload_sphere})
+    sphere_mesh = mesh_cache.get("sphere", sectors, stacks)
     last_frame_time = glfw.get_time()
     frame_count = 0
     last_fps_time = last_frame_time
     while not glfw.window_should_close(window):
+        sphere_mesh = mesh_builder.poll() or sphere_mesh
         display(window)
         current_time = glfw.get_time()
         delta_time = current_time - last_frame_time
@@ -54,6 +64,9 @@ def main():
             print(f"FPS: {frame_count}")
             frame_count = 0
             last_fps_time = current_time
+    mesh_builder.close()
+    print(mesh_cache.report())
+    mesh_cache.clear()
     glfw.destroy_window(window)
     glfw.terminate()
 
@@ -99,67 +112,41 @@ def generate_checkerboard_texture():
     gluBuild2DMipmaps(GL_TEXTURE_2D, GL_RGB, width, height, GL_RGB, GL_UNSIGNED_BYTE, texture_bytes)
     return texture_id
 
+def sphere_arrays(sectors, stacks):
+    positions, normals, tex_coords, indices = uv_sphere(sectors, stacks)
+    return interleave(positions, normals, tex_coords), indices
+
 def create_sphere_vbo(sectors, stacks):
-    radius = 1.0
-    vertices = []
-    normals = []
-    tex_coords = []
-    indices = []
-    sector_step = 2 * math.pi / sectors
-    stack_step = math.pi / stacks
-    def add_vertex(theta, phi):
-        x = math.sin(theta) * math.cos(phi)
-        y = math.sin(theta) * math.sin(phi)
-        z = math.cos(theta)
-        s = phi / (2 * math.pi)
-        t = theta / math.pi
-        vertices.append((radius * x, radius * y, radius * z))
-        normals.append((x, y, z))
-        tex_coords.append((s, t))
-    index = 0
-    for i in range(stacks):
-        theta1 = i * stack_step
-        theta2 = (i + 1) * stack_step
-        for j in range(sectors):
-            phi1 = j * sector_step
-            phi2 = (j + 1) * sector_step
-            add_vertex(theta1, phi1)
-            add_vertex(theta2, phi1)
-            add_vertex(theta2, phi2)
-            add_vertex(theta1, phi2)
-            indices.append(index)
-            indices.append(index + 1)
-            indices.append(index + 2)
-            indices.append(index)
-            indices.append(index + 2)
-            indices.append(index + 3)
-            index += 4
-    vbo_vertices = glGenBuffers(1)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo_vertices)
-    glBufferData(GL_ARRAY_BUFFER, len(vertices)*3*4, (GLfloat * len(vertices*3))(*sum(vertices, ())), GL_STATIC_DRAW)
-    vbo_normals = glGenBuffers(1)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo_normals)
-    glBufferData(GL_ARRAY_BUFFER, len(normals)*3*4, (GLfloat * len(normals*3))(*sum(normals, ())), GL_STATIC_DRAW)
-    vbo_texcoords = glGenBuffers(1)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo_texcoords)
-    glBufferData(GL_ARRAY_BUFFER, len(tex_coords)*2*4, (GLfloat * len(tex_coords*2))(*sum(tex_coords, ())), GL_STATIC_DRAW)
-    sphere_list = glGenLists(1)
-    glNewList(sphere_list, GL_COMPILE)
+    return upload_sphere(*sphere_arrays(sectors, stacks))
+
+def upload_sphere(vertices, indices):
+    vbo = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    ebo = glGenBuffers(1)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    return GpuMesh([vbo, ebo], len(indices), vertices.nbytes + indices.nbytes)
+
+def draw_sphere(mesh):
+    stride = 8 * 4
+    vbo, ebo = mesh.buffers
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
     glEnableClientState(GL_VERTEX_ARRAY)
     glEnableClientState(GL_NORMAL_ARRAY)
     glEnableClientState(GL_TEXTURE_COORD_ARRAY)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo_vertices)
-    glVertexPointer(3, GL_FLOAT, 0, None)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo_normals)
-    glNormalPointer(GL_FLOAT, 0, None)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo_texcoords)
-    glTexCoordPointer(2, GL_FLOAT, 0, None)
-    glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, (GLuint * len(indices))(*indices))
+    glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+    glNormalPointer(GL_FLOAT, stride, ctypes.c_void_p(3 * 4))
+    glTexCoordPointer(2, GL_FLOAT, stride, ctypes.c_void_p(6 * 4))
+    glDrawElements(GL_TRIANGLES, mesh.count, GL_UNSIGNED_INT, None)
     glDisableClientState(GL_VERTEX_ARRAY)
     glDisableClientState(GL_NORMAL_ARRAY)
     glDisableClientState(GL_TEXTURE_COORD_ARRAY)
-    glEndList()
-    return sphere_list, vbo_vertices, vbo_normals, vbo_texcoords, len(indices)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
 
 def display(window):
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -193,7 +180,7 @@ def display(window):
         glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
     else:
         glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
-    glCallList(sphere_list)
+    draw_sphere(sphere_mesh)
     glPopMatrix()
     glfw.swap_buffers(window)
     glfw.poll_events()
@@ -245,7 +232,7 @@ def update_position(delta_time):
 def key_callback(window, key, scancode, action, mods):
     global angle_x, angle_y, angle_z, wireframe, sectors, stacks
     global light_enabled, texture_enabled, attenuation_enabled
-    global sphere_list, vbo_vertices, vbo_normals, vbo_texcoords, index_count
+    global sphere_mesh
     global position, velocity
     if action == glfw.PRESS or action == glfw.REPEAT:
         if key == glfw.KEY_X: angle_x += 5
@@ -255,11 +242,11 @@ def key_callback(window, key, scancode, action, mods):
         elif key == glfw.KEY_UP:
             sectors += 1
             stacks += 1
-            sphere_list, vbo_vertices, vbo_normals, vbo_texcoords, index_count = create_sphere_vbo(sectors, stacks)
+            sphere_mesh = mesh_builder.request("sphere", sectors, stacks) or sphere_mesh
         elif key == glfw.KEY_DOWN:
             sectors = max(4, sectors - 1)
             stacks = max(4, stacks - 1)
-            sphere_list, vbo_vertices, vbo_normals, vbo_texcoords, index_count = create_sphere_vbo(sectors, stacks)
+            sphere_mesh = mesh_builder.request("sphere", sectors, stacks) or sphere_mesh
         elif key == glfw.KEY_L:
             light_enabled = not light_enabled
             print(f"Освещение: {'ВКЛ' if light_enabled else 'ВЫКЛ'}")
@@ -1,9 +1,18 @@
+import os
+import sys
 import glfw
 from OpenGL.GL import *
 import OpenGL.GL.shaders as shaders
 import numpy as np
 import math
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from mesh import uv_sphere, icosphere, ICOSPHERE_MAX_LEVEL
+from meshcache import GpuMesh, MeshCache
+from meshbuilder import MeshBuilder
+
+MESH_BUDGET = 64 << 20
+
 angle_x = 0.0
 angle_y = 0.0
 angle_z = 0.0
@@ -11,6 +20,11 @@ size = 1.0
 wireframe = False
 sectors = 10  
 stacks = 10 
+icosphere_enabled = False
+icosphere_level = 3
+mesh_cache = None
+mesh_builder = None
+current_mesh = None
 
 VERTEX_SHADER = """
 #version 330 core
@@ -71,9 +85,9 @@ def create_vao(vertices, indices):
     glEnableVertexAttribArray(0)
     glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
     glBindVertexArray(0)
-    return vao, len(indices)
+    return GpuMesh([vbo, ebo], len(indices), vertices.nbytes + indices.nbytes, vao)
 
-def draw_rhombus_vao():
+def rhombus_arrays(sectors=0, stacks=0):
     vertices = np.array([
         (0, 0, 1),   
         (1, 1, 0),   
@@ -87,29 +101,24 @@ def draw_rhombus_vao():
         (5, 1, 2), (5, 2, 3), (5, 3, 4), (5, 4, 1)
     ]
     indices = np.array(faces, dtype=np.uint32).flatten()
-    return create_vao(vertices, indices)
+    return vertices, indices
+
+def sphere_arrays(sectors, stacks):
+    vertices, _, _, indices = uv_sphere(sectors, stacks)
+    return vertices, indices
+
+def icosphere_arrays(level, _=0):
+    vertices, _, _, indices = icosphere(level)
+    return vertices, indices
+
+def draw_rhombus_vao(sectors=0, stacks=0):
+    return create_vao(*rhombus_arrays())
 
 def draw_sphere_vao(sectors, stacks):
-    radius = 1.0
-    vertices = []
-    indices = []
-    for i in range(stacks + 1):
-        theta = i * math.pi / stacks
-        for j in range(sectors + 1):
-            phi = j * 2 * math.pi / sectors
-            x = math.sin(theta) * math.cos(phi)
-            y = math.sin(theta) * math.sin(phi)
-            z = math.cos(theta)
-            vertices.append((x, y, z))
-    for i in range(stacks):
-        for j in range(sectors):
-            first = i * (sectors + 1) + j
-            second = first + sectors + 1
-            indices.extend([first, second, first + 1])
-            indices.extend([second, second + 1, first + 1])
-    vertices = np.array(vertices, dtype=np.float32)
-    indices = np.array(indices, dtype=np.uint32)
-    return create_vao(vertices, indices)
+    return create_vao(*sphere_arrays(sectors, stacks))
+
+def draw_icosphere_vao(level, _=0):
+    return create_vao(*icosphere_arrays(level))
 
 def perspective(fov, aspect, near, far):
     f = 1.0 / math.tan(math.radians(fov) / 2)
@@ -137,6 +146,7 @@ def normalize(v):
 
 def main():
     global angle_x, angle_y, angle_z, size, wireframe, sectors, stacks
+    global mesh_cache, mesh_builder, current_mesh
     if not glfw.init():
         return
     window = glfw.create_window(640, 640, "Lab8", None, None)
@@ -148,9 +158,14 @@ def main():
     glfw.set_scroll_callback(window, scroll_callback)
     glEnable(GL_DEPTH_TEST)
     shader = compile_shader()
-    rhombus_vao, rhombus_index_count = draw_rhombus_vao()
-    sphere_vao, sphere_index_count = draw_sphere_vao(sectors, stacks)
+    mesh_cache = MeshCache({"rhombus": draw_rhombus_vao, "sphere": draw_sphere_vao,
+                            "icosphere": draw_icosphere_vao}, MESH_BUDGET)
+    mesh_builder = MeshBuilder(mesh_cache,
+                               {"rhombus": rhombus_arrays, "sphere": sphere_arrays, "icosphere": icosphere_arrays},
+                               {"rhombus": create_vao, "sphere": create_vao, "icosphere": create_vao})
+    current_mesh = mesh_cache.get(*mesh_key())
     while not glfw.window_should_close(window):
+        current_mesh = mesh_builder.poll() or current_mesh
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glClearColor(1.0, 1.0, 1.0, 1.0)
         glUseProgram(shader)
@@ -170,19 +185,28 @@ def main():
             glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
         else:
             glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
-        if sectors <= 4 and stacks <= 4:
-            glBindVertexArray(rhombus_vao)
-            glDrawElements(GL_TRIANGLES, rhombus_index_count, GL_UNSIGNED_INT, None)
-        else:
-            sphere_vao, sphere_index_count = draw_sphere_vao(sectors, stacks)
-            glBindVertexArray(sphere_vao)
-            glDrawElements(GL_TRIANGLES, sphere_index_count, GL_UNSIGNED_INT, None)
+        glBindVertexArray(current_mesh.vao)
+        glDrawElements(GL_TRIANGLES, current_mesh.count, GL_UNSIGNED_INT, None)
         glBindVertexArray(0)
         glfw.swap_buffers(window)
         glfw.poll_events()
+    mesh_builder.close()
+    print(mesh_cache.report())
+    mesh_cache.clear()
     glfw.destroy_window(window)
     glfw.terminate()
 
+def mesh_key():
+    if icosphere_enabled:
+        return "icosphere", icosphere_level, 0
+    if sectors <= 4 and stacks <= 4:
+        return "rhombus", 0, 0
+    return "sphere", sectors, stacks
+
+def select_mesh():
+    global current_mesh
+    current_mesh = mesh_builder.request(*mesh_key()) or current_mesh
+
 def rotate(angle, axis):
     angle_rad = math.radians(angle)
     c = math.cos(angle_rad)
@@ -220,17 +244,30 @@ def scale(factor):
 
 def key_callback(window, key, scancode, action, mods):
     global angle_x, angle_y, angle_z, wireframe, sectors, stacks
+    global icosphere_enabled, icosphere_level
     if action == glfw.PRESS or action == glfw.REPEAT:
         if key == glfw.KEY_X: angle_x += 5
         elif key == glfw.KEY_Y: angle_y += 5
         elif key == glfw.KEY_Z: angle_z += 5
         elif key == glfw.KEY_SPACE: wireframe = not wireframe
         elif key == glfw.KEY_UP:
-            sectors += 1
-            stacks += 1
+            if icosphere_enabled:
+                icosphere_level = min(ICOSPHERE_MAX_LEVEL, icosphere_level + 1)
+            else:
+                sectors += 1
+                stacks += 1
+            select_mesh()
         elif key == glfw.KEY_DOWN:
-            sectors = max(4, sectors - 1)
-            stacks = max(4, stacks - 1)
+            if icosphere_enabled:
+                icosphere_level = max(0, icosphere_level - 1)
+            else:
+                sectors = max(4, sectors - 1)
+                stacks = max(4, stacks - 1)
+            select_mesh()
+        elif key == glfw.KEY_I:
+            icosphere_enabled = not icosphere_enabled
+            print(f"Икосфера: {'ВКЛ' if icosphere_enabled else 'ВЫКЛ'}")
+            select_mesh()
 
 def scroll_callback(window, xoffset, yoffset):
     global size
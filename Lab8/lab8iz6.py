@@ -1,21 +1,33 @@
+import os
+import sys
 import glfw
 from OpenGL.GL import *
 import OpenGL.GL.shaders as shaders
 import numpy as np
 import math
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from mesh import uv_sphere, icosphere, ICOSPHERE_MAX_LEVEL
+from meshcache import GpuMesh, MeshCache
+from meshbuilder import MeshBuilder
+
+MESH_BUDGET = 64 << 20
+
 angle_x = angle_y = angle_z = 0.0
 size = 1.0
 wireframe = False
 sectors = stacks = 20
+icosphere_enabled = False
+icosphere_level = 3
 light_enabled = True
 texture_enabled = True
 attenuation_enabled = True
 position = [0.0, 0.0, 0.0]
 velocity = [0.0003, 0.0005, 0.0002]
 box_size = 4.0
-sphere_vao = None
-sphere_index_count = 0
+mesh_cache = None
+mesh_builder = None
+sphere_mesh = None
 texture_id = 0
 
 VERTEX_SHADER = """
@@ -106,38 +118,19 @@ def generate_checkerboard_texture():
                  GL_RGB, GL_UNSIGNED_BYTE, texture_bytes)
     return texture_id
 
+def sphere_arrays(sectors, stacks):
+    return uv_sphere(sectors, stacks, up="y", flip_v=True)
+
+def icosphere_arrays(level, _=0):
+    return icosphere(level, up="y", flip_v=True)
+
 def create_sphere_vao(sectors, stacks):
-    radius = 1.0
-    vertices = []
-    normals = []
-    uvs = []
-    indices = []
-    for i in range(stacks + 1):
-        theta = i * math.pi / stacks
-        sinTheta = math.sin(theta)
-        cosTheta = math.cos(theta)
-        for j in range(sectors + 1):
-            phi = j * 2 * math.pi / sectors
-            sinPhi = math.sin(phi)
-            cosPhi = math.cos(phi)
-            x = cosPhi * sinTheta
-            y = cosTheta
-            z = sinPhi * sinTheta
-            u = j / sectors
-            v = 1 - i / stacks
-            normals.append((x, y, z))
-            vertices.append((radius * x, radius * y, radius * z))
-            uvs.append((u, v))
-    for i in range(stacks):
-        for j in range(sectors):
-            first = i * (sectors + 1) + j
-            second = first + sectors + 1
-            indices.extend([first, second, first + 1])
-            indices.extend([second, second + 1, first + 1])
-    vertex_data = np.array(vertices, dtype=np.float32)
-    normal_data = np.array(normals, dtype=np.float32)
-    uv_data = np.array(uvs, dtype=np.float32)
-    index_data = np.array(indices, dtype=np.uint32)
+    return upload_sphere(*sphere_arrays(sectors, stacks))
+
+def create_icosphere_vao(level, _=0):
+    return upload_sphere(*icosphere_arrays(level))
+
+def upload_sphere(vertex_data, normal_data, uv_data, index_data):
     vbo_positions = glGenBuffers(1)
     vbo_normals = glGenBuffers(1)
     vbo_uvs = glGenBuffers(1)
@@ -159,7 +152,8 @@ def create_sphere_vao(sectors, stacks):
     glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
     glBufferData(GL_ELEMENT_ARRAY_BUFFER, index_data.nbytes, index_data, GL_STATIC_DRAW)
     glBindVertexArray(0)
-    return vao, len(index_data)
+    nbytes = vertex_data.nbytes + normal_data.nbytes + uv_data.nbytes + index_data.nbytes
+    return GpuMesh([vbo_positions, vbo_normals, vbo_uvs, ebo], len(index_data), nbytes, vao)
 
 def update_position():
     global position, velocity
@@ -234,7 +228,7 @@ def normalize(v):
     return v / norm if norm != 0 else v
 
 def main():
-    global sphere_vao, sphere_index_count, texture_id
+    global mesh_cache, mesh_builder, sphere_mesh, texture_id
     if not glfw.init():
         return
     window = glfw.create_window(640, 640, "Lab8", None, None)
@@ -246,8 +240,12 @@ def main():
     glEnable(GL_DEPTH_TEST)
     shader = compile_shader()
     texture_id = generate_checkerboard_texture()
-    sphere_vao, sphere_index_count = create_sphere_vao(sectors, stacks)
+    mesh_cache = MeshCache({"sphere": create_sphere_vao, "icosphere": create_icosphere_vao}, MESH_BUDGET)
+    mesh_builder = MeshBuilder(mesh_cache, {"sphere": sphere_arrays, "icosphere": icosphere_arrays},
+                               {"sphere": upload_sphere, "icosphere": upload_sphere})
+    sphere_mesh = mesh_cache.get(*mesh_key())
     while not glfw.window_should_close(window):
+        sphere_mesh = mesh_builder.poll() or sphere_mesh
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glClearColor(0.1, 0.1, 0.1, 1.0)
         glUseProgram(shader)
@@ -281,29 +279,50 @@ def main():
             glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
         else:
             glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
-        glBindVertexArray(sphere_vao)
-        glDrawElements(GL_TRIANGLES, sphere_index_count, GL_UNSIGNED_INT, None)
+        glBindVertexArray(sphere_mesh.vao)
+        glDrawElements(GL_TRIANGLES, sphere_mesh.count, GL_UNSIGNED_INT, None)
         glBindVertexArray(0)
         glfw.swap_buffers(window)
         glfw.poll_events()
         update_position()
+    mesh_builder.close()
+    print(mesh_cache.report())
+    mesh_cache.clear()
     glfw.destroy_window(window)
     glfw.terminate()
 
+def mesh_key():
+    if icosphere_enabled:
+        return "icosphere", icosphere_level, 0
+    return "sphere", sectors, stacks
+
 def key_callback(window, key, scancode, action, mods):
     global angle_x, angle_y, angle_z, wireframe, sectors, stacks
-    global light_enabled, texture_enabled, attenuation_enabled
+    global light_enabled, texture_enabled, attenuation_enabled, sphere_mesh
+    global icosphere_enabled, icosphere_level
     if action == glfw.PRESS or action == glfw.REPEAT:
         if key == glfw.KEY_X: angle_x += 5
         elif key == glfw.KEY_Y: angle_y += 5
         elif key == glfw.KEY_Z: angle_z += 5
         elif key == glfw.KEY_SPACE: wireframe = not wireframe
         elif key == glfw.KEY_UP:
-            sectors += 1
-            stacks += 1
+            if icosphere_enabled:
+                icosphere_level = min(ICOSPHERE_MAX_LEVEL, icosphere_level + 1)
+            else:
+                sectors += 1
+                stacks += 1
+            sphere_mesh = mesh_builder.request(*mesh_key()) or sphere_mesh
         elif key == glfw.KEY_DOWN:
-            sectors = max(4, sectors - 1)
-            stacks = max(4, stacks - 1)
+            if icosphere_enabled:
+                icosphere_level = max(0, icosphere_level - 1)
+            else:
+                sectors = max(4, sectors - 1)
+                stacks = max(4, stacks - 1)
+            sphere_mesh = mesh_builder.request(*mesh_key()) or sphere_mesh
+        elif key == glfw.KEY_I:
+            icosphere_enabled = not icosphere_enabled
+            print(f"Икосфера: {'ВКЛ' if icosphere_enabled else 'ВЫКЛ'}")
+            sphere_mesh = mesh_builder.request(*mesh_key()) or sphere_mesh
         elif key == glfw.KEY_L:
             light_enabled = not light_enabled
             print(f"Освещение: {'ВКЛ' if light_enabled else 'ВЫКЛ'}")